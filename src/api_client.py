@@ -0,0 +1,244 @@
+"""
+Cliente Asíncrono de la API - California Housing
+================================================
+
+Cliente httpx.AsyncClient compartido por las interfaces de Streamlit.
+El cliente vive en un event loop propio (hilo en segundo plano) para que
+el pool de conexiones keep-alive sobreviva a los reruns de Streamlit y
+pueda atender a varias sesiones de usuario de forma concurrente.
+Las predicciones individuales de todas las sesiones se agrupan durante
+unos milisegundos y se envían juntas a /predict/batch.
+
+Autor: MLOps Pipeline Project
+Fecha: Noviembre 2025
+"""
+
+import asyncio
+import atexit
+import logging
+import threading
+
+import httpx
+import orjson
+
+
+logger = logging.getLogger(__name__)
+
+# Cabeceras para los cuerpos JSON serializados con orjson
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+# ============================================================================
+# Cliente asíncrono
+# ============================================================================
+
+class AsyncAPIClient:
+    """
+    Ejecuta las llamadas a la API en un event loop dedicado.
+
+    Streamlit ejecuta el script de forma síncrona, por lo que un
+    asyncio.run() por clic crearía (y cerraría) un loop en cada llamada,
+    invalidando las conexiones del pool. Aquí el loop y el cliente se crean
+    una sola vez y los hilos de Streamlit les envían corrutinas.
+    """
+
+    def __init__(self, base_url, timeout=5.0, max_connections=100,
+                 max_keepalive_connections=20, max_batch_size=32,
+                 max_queue_time=0.02):
+        """
+        Inicializa el loop en segundo plano y el cliente httpx.
+
+        Args:
+            base_url: URL base de la API
+            timeout: Timeout por petición en segundos
+            max_connections: Máximo de conexiones simultáneas
+            max_keepalive_connections: Máximo de conexiones keep-alive en el pool
+            max_batch_size: Máximo de predicciones agrupadas por lote
+            max_queue_time: Tiempo máximo (s) que una predicción espera a formar lote
+        """
+        self.timeout = timeout
+        self.max_batch_size = max_batch_size
+        self.max_queue_time = max_queue_time
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever,
+            name="api-client-loop",
+            daemon=True
+        )
+        self._thread.start()
+
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections
+        )
+        self.client = self.run(self._create_client(base_url, limits))
+        self._queue = None
+        self._batch_task = None
+        self._pending_batches = set()
+        self.run(self._start_batcher())
+        atexit.register(self.close)
+
+    async def _create_client(self, base_url, limits):
+        """Crea el AsyncClient dentro del loop que lo va a usar"""
+        return httpx.AsyncClient(base_url=base_url, limits=limits, timeout=self.timeout)
+
+    def submit(self, coro):
+        """
+        Envía una corrutina al loop sin bloquear.
+
+        Args:
+            coro: Corrutina a ejecutar
+
+        Returns:
+            concurrent.futures.Future con el resultado
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run(self, coro):
+        """Ejecuta una corrutina en el loop y espera su resultado"""
+        return self.submit(coro).result()
+
+    async def predict(self, features):
+        """
+        Realiza una predicción individual contra /predict.
+
+        Args:
+            features: Diccionario con las características de la vivienda
+
+        Returns:
+            Respuesta de la API o diccionario con la clave 'error'
+        """
+        try:
+            response = await self.client.post(
+                "/predict", content=orjson.dumps(features), headers=JSON_HEADERS
+            )
+
+            if response.status_code == 200:
+                return orjson.loads(response.content)
+            else:
+                return {"error": f"Error {response.status_code}: {response.text}"}
+        except Exception as e:
+            return {"error": str(e)}
+
+    # ========================================================================
+    # Agrupación de predicciones en lotes
+    # ========================================================================
+
+    async def _start_batcher(self):
+        """Crea la cola de predicciones y la tarea que forma los lotes"""
+        self._queue = asyncio.Queue()
+        self._batch_task = asyncio.get_running_loop().create_task(self._batch_worker())
+
+    async def predict_batched(self, features):
+        """
+        Encola una predicción para enviarla agrupada a /predict/batch.
+
+        Args:
+            features: Diccionario con las características de la vivienda
+
+        Returns:
+            Respuesta con el mismo formato que /predict o diccionario con 'error'
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((features, future))
+        return await future
+
+    async def _batch_worker(self):
+        """Agrupa hasta max_batch_size predicciones o max_queue_time segundos"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_queue_time
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # El lote se procesa en su propia tarea para seguir formando el siguiente
+            task = loop.create_task(self._process_batch(batch))
+            self._pending_batches.add(task)
+            task.add_done_callback(self._pending_batches.discard)
+
+    async def _process_batch(self, batch):
+        """Envía un lote a la API y resuelve el future de cada predicción"""
+        try:
+            if len(batch) == 1:
+                results = [await self.predict(batch[0][0])]
+            else:
+                results = await self._predict_batch([features for features, _ in batch])
+        except Exception:
+            logger.exception("Error procesando un lote de %d predicciones", len(batch))
+            results = []
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+        # Ningún future puede quedar pendiente: la interfaz lo sondearía indefinidamente
+        for _, future in batch[len(results):]:
+            if not future.done():
+                future.set_exception(RuntimeError("La API no devolvió resultado para esta predicción"))
+
+    async def _predict_batch(self, instances):
+        """
+        Realiza varias predicciones con una sola llamada a /predict/batch.
+
+        Si el lote es rechazado (p. ej. una instancia inválida), falla o no
+        trae una predicción por instancia, se registra el motivo y se repite
+        cada predicción por separado para que el error no afecte al resto.
+
+        Args:
+            instances: Lista de diccionarios de características
+
+        Returns:
+            Lista de respuestas con el formato de /predict
+        """
+        try:
+            response = await self.client.post(
+                "/predict/batch",
+                content=orjson.dumps({"instances": instances}),
+                headers=JSON_HEADERS
+            )
+
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+                if len(data["predictions"]) == len(instances):
+                    return [
+                        {
+                            "prediction": prediction,
+                            "model_name": data["model_name"],
+                            "timestamp": data["timestamp"]
+                        }
+                        for prediction in data["predictions"]
+                    ]
+                logger.warning(
+                    "/predict/batch devolvió %d predicciones para %d instancias; se repiten por separado",
+                    len(data["predictions"]), len(instances)
+                )
+            else:
+                logger.warning(
+                    "/predict/batch respondió %d; se repiten las %d predicciones por separado",
+                    response.status_code, len(instances)
+                )
+        except Exception as e:
+            logger.warning("Error en /predict/batch (%r); se repiten las %d predicciones por separado",
+                           e, len(instances))
+
+        return await asyncio.gather(*(self.predict(features) for features in instances))
+
+    def close(self):
+        """Cierra el cliente y detiene el loop"""
+        if self._loop.is_closed():
+            return
+        if self._loop.is_running():
+            if self._batch_task is not None:
+                self._loop.call_soon_threadsafe(self._batch_task.cancel)
+            self.submit(self.client.aclose()).result(timeout=self.timeout)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=self.timeout)
+        self._loop.close()
@@ -13,7 +13,7 @@ import pandas as pd
 import numpy as np
 import json
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.preprocessing import StandardScaler, OneHotEncoder, FunctionTransformer
 from sklearn.impute import SimpleImputer
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
@@ -22,6 +22,78 @@ import os
 from datetime import datetime
 
 
+# Tipos del esquema de California Housing: float32 reduce a la mitad la memoria numérica
+# y ocean_proximity como Categorical evita manejar strings de Python
+_HOUSING_DTYPES = {
+    'longitude': np.float32,
+    'latitude': np.float32,
+    'housing_median_age': np.float32,
+    'total_rooms': np.float32,
+    'total_bedrooms': np.float32,
+    'population': np.float32,
+    'households': np.float32,
+    'median_income': np.float32,
+    'median_house_value': np.float32,
+    'ocean_proximity': 'category'
+}
+
+# Features derivados que se agregan al final del bloque numérico
+DERIVED_FEATURES = ['rooms_per_household', 'bedrooms_per_room', 'population_per_household']
+
+
+def compute_ratios(total_rooms, total_bedrooms, population, households, out=None):
+    """
+    Calcula los features derivados sobre arrays float64.
+    
+    Las divisiones por cero quedan como NaN directamente (sin pasar por inf).
+    
+    Args:
+        total_rooms, total_bedrooms, population, households (np.ndarray): Columnas base
+        out (np.ndarray): Array (n, 3) donde escribir los ratios (se crea si no se especifica)
+        
+    Returns:
+        np.ndarray: Ratios en el orden de DERIVED_FEATURES
+    """
+    if out is None:
+        out = np.empty((len(total_rooms), 3))
+    out.fill(np.nan)
+    
+    # Feature 1: Habitaciones por hogar
+    np.divide(total_rooms, households, out=out[:, 0], where=households != 0)
+    
+    # Feature 2: Proporción de dormitorios
+    np.divide(total_bedrooms, total_rooms, out=out[:, 1], where=total_rooms != 0)
+    
+    # Feature 3: Población por hogar
+    np.divide(population, households, out=out[:, 2], where=households != 0)
+    
+    return out
+
+
+def add_derived_features(df):
+    """
+    Agrega los features derivados (ratios) al DataFrame de entrada.
+    
+    Se usa como paso 'derive' del pipeline de preprocesamiento, por lo que
+    se serializa junto al preprocessor y se aplica igual en entrenamiento
+    y en la API.
+    
+    Args:
+        df (pd.DataFrame): Dataset con las columnas originales
+        
+    Returns:
+        pd.DataFrame: Nuevo DataFrame con los features derivados
+    """
+    # Columnas base como un único bloque float64 (una sola pasada sobre 4 columnas)
+    base = df[['total_rooms', 'total_bedrooms', 'population', 'households']].to_numpy(
+        dtype=np.float64, copy=False
+    )
+    ratios = compute_ratios(*base.T)
+    
+    # assign() comparte los bloques existentes en lugar de copiar todo el DataFrame
+    return df.assign(**{name: ratios[:, i] for i, name in enumerate(DERIVED_FEATURES)})
+
+
 class FeatureEngineer:
     """
     Clase para realizar feature engineering en el dataset de California Housing.
@@ -41,6 +113,10 @@ class FeatureEngineer:
         self.preprocessor = None
         self.feature_names = None
         
+        # Clasificación de columnas calculada en prepare_features
+        self._numeric_features = None
+        self._categorical_features = None
+        
     def load_data(self):
         """
         Carga el dataset desde el archivo CSV.
@@ -49,7 +125,7 @@ class FeatureEngineer:
             pd.DataFrame: Dataset cargado
         """
         data_path = f"../{self.config['data_file']}"
-        df = pd.read_csv(data_path)
+        df = pd.read_csv(data_path, dtype=_HOUSING_DTYPES, engine='c')
         print(f"✓ Dataset cargado: {df.shape[0]:,} filas × {df.shape[1]} columnas")
         return df
     
@@ -68,19 +144,7 @@ class FeatureEngineer:
         Returns:
             pd.DataFrame: Dataset con features derivados
         """
-        df = df.copy()
-        
-        # Feature 1: Habitaciones por hogar
-        df['rooms_per_household'] = df['total_rooms'] / df['households']
-        
-        # Feature 2: Proporción de dormitorios
-        df['bedrooms_per_room'] = df['total_bedrooms'] / df['total_rooms']
-        
-        # Feature 3: Población por hogar
-        df['population_per_household'] = df['population'] / df['households']
-        
-        # Manejar valores infinitos (división por cero)
-        df.replace([np.inf, -np.inf], np.nan, inplace=True)
+        df = add_derived_features(df)
         
         print("✓ Features derivados creados:")
         print("  • rooms_per_household")
@@ -105,8 +169,12 @@ class FeatureEngineer:
         y = df[target_col]
         
         # Identificar columnas numéricas y categóricas
-        numeric_features = X.select_dtypes(include=['int64', 'float64']).columns.tolist()
-        categorical_features = X.select_dtypes(include=['object']).columns.tolist()
+        numeric_features = X.select_dtypes(include=['number']).columns.tolist()
+        categorical_features = X.select_dtypes(include=['object', 'category']).columns.tolist()
+        
+        # Guardar la clasificación para reutilizarla al construir el preprocessor
+        self._numeric_features = numeric_features
+        self._categorical_features = categorical_features
         
         print(f"\n✓ Features preparados:")
         print(f"  • Features numéricos: {len(numeric_features)}")
@@ -115,7 +183,7 @@ class FeatureEngineer:
         
         return X, y, numeric_features, categorical_features
     
-    def build_preprocessor(self, numeric_features, categorical_features):
+    def build_preprocessor(self, numeric_features=None, categorical_features=None):
         """
         Construye el pipeline de preprocesamiento con transformadores.
         
@@ -125,34 +193,53 @@ class FeatureEngineer:
         
         Pipeline categórico:
         - SimpleImputer (estrategia: constante con valor 'missing')
-        - OneHotEncoder
+        - OneHotEncoder (salida dispersa)
+        
+        La salida combinada solo es dispersa si su densidad queda bajo
+        sparse_threshold; con el bloque numérico denso del dataset actual
+        el resultado sigue siendo un ndarray denso.
         
         Args:
             numeric_features (list): Lista de features numéricos
+                (usa la clasificación de prepare_features si no se especifica)
             categorical_features (list): Lista de features categóricos
+                (usa la clasificación de prepare_features si no se especifica)
             
         Returns:
             ColumnTransformer: Preprocessor completo
         """
+        if numeric_features is None or categorical_features is None:
+            if self._numeric_features is None:
+                raise ValueError("Las columnas no han sido clasificadas. Ejecuta prepare_features primero.")
+            if numeric_features is None:
+                numeric_features = self._numeric_features
+            if categorical_features is None:
+                categorical_features = self._categorical_features
+        
         # Pipeline para features numéricos
         numeric_transformer = Pipeline(steps=[
             ('imputer', SimpleImputer(strategy='median')),
             ('scaler', StandardScaler())
         ])
         
-        # Pipeline para features categóricos
+        # Pipeline para features categóricos (one-hot disperso: un valor no nulo por fila)
         categorical_transformer = Pipeline(steps=[
             ('imputer', SimpleImputer(strategy='constant', fill_value='missing')),
-            ('onehot', OneHotEncoder(handle_unknown='ignore', sparse_output=False))
+            ('onehot', OneHotEncoder(handle_unknown='ignore', sparse_output=True))
         ])
         
-        # Combinar transformadores
+        # Con pocas columnas el overhead de joblib supera la ganancia de paralelizar
+        n_jobs = -1 if len(numeric_features) + len(categorical_features) >= 4 else 1
+        
+        # Combinar transformadores (las ramas numérica y categórica son independientes)
         preprocessor = ColumnTransformer(
             transformers=[
                 ('num', numeric_transformer, numeric_features),
                 ('cat', categorical_transformer, categorical_features)
             ],
-            remainder='passthrough'
+            remainder='drop',
+            sparse_threshold=0.3,
+            n_jobs=n_jobs
         )
         
         print("\n✓ Pipeline de preprocesamiento construido:")
@@ -161,6 +248,33 @@ class FeatureEngineer:
         
         return preprocessor
     
+    def build_pipeline(self, numeric_features=None, categorical_features=None):
+        """
+        Construye el pipeline completo: features derivados + preprocessor.
+        
+        Al incluir el cálculo de features derivados como primer paso, el
+        entrenamiento se resuelve con una sola llamada a fit_transform y el
+        pickle guardado contiene todo el preprocesamiento.
+        
+        Args:
+            numeric_features (list): Lista de features numéricos (incluye derivados).
+                Si no se especifica, usa la clasificación de prepare_features más
+                los features derivados.
+            categorical_features (list): Lista de features categóricos
+            
+        Returns:
+            Pipeline: Pipeline con pasos 'derive' y 'prep'
+        """
+        if numeric_features is None and self._numeric_features is not None:
+            numeric_features = self._numeric_features + [
+                f for f in DERIVED_FEATURES if f not in self._numeric_features
+            ]
+        
+        return Pipeline(steps=[
+            ('derive', FunctionTransformer(add_derived_features, validate=False)),
+            ('prep', self.build_preprocessor(numeric_features, categorical_features))
+        ])
+    
     def fit_transform(self, X_train):
         """
         Ajusta y transforma los datos de entrenamiento.
@@ -207,7 +321,12 @@ class FeatureEngineer:
         """
         feature_names = []
         
-        for name, transformer, features in self.preprocessor.transformers_:
+        # El ColumnTransformer es el paso 'prep' cuando se usa el pipeline completo
+        column_transformer = self.preprocessor
+        if isinstance(column_transformer, Pipeline):
+            column_transformer = column_transformer.named_steps['prep']
+        
+        for name, transformer, features in column_transformer.transformers_:
             if name == 'num':
                 feature_names.extend(features)
             elif name == 'cat':
@@ -264,11 +383,10 @@ def prepare_data_for_training(config_path='../config.json', test_size=0.2, save_
     
     Realiza todo el pipeline de feature engineering:
     1. Carga de datos
-    2. Creación de features derivados
-    3. Separación de features y target
-    4. Train/test split
-    5. Construcción y aplicación del preprocessor
-    6. Guardado del preprocessor (opcional)
+    2. Separación de features y target
+    3. Train/test split
+    4. Construcción y aplicación del pipeline (features derivados + preprocessor)
+    5. Guardado del preprocessor (opcional)
     
     Args:
         config_path (str): Ruta al archivo de configuración
@@ -286,19 +404,15 @@ def prepare_data_for_training(config_path='../config.json', test_size=0.2, save_
     fe = FeatureEngineer(config_path)
     
     # 1. Cargar datos
-    print("\n[1/6] Cargando datos...")
+    print("\n[1/5] Cargando datos...")
     df = fe.load_data()
     
-    # 2. Crear features derivados
-    print("\n[2/6] Creando features derivados...")
-    df = fe.create_derived_features(df)
-    
-    # 3. Preparar features y target
-    print("\n[3/6] Preparando features y target...")
+    # 2. Preparar features y target
+    print("\n[2/5] Preparando features y target...")
     X, y, numeric_features, categorical_features = fe.prepare_features(df)
     
-    # 4. Train/test split
-    print(f"\n[4/6] Dividiendo datos (test_size={test_size})...")
+    # 3. Train/test split
+    print(f"\n[3/5] Dividiendo datos (test_size={test_size})...")
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, 
         test_size=test_size, 
@@ -308,18 +422,19 @@ def prepare_data_for_training(config_path='../config.json', test_size=0.2, save_
     print(f"  • Train: {X_train.shape[0]:,} muestras")
     print(f"  • Test: {X_test.shape[0]:,} muestras")
     
-    # 5. Construir y aplicar preprocessor
-    print("\n[5/6] Aplicando transformaciones...")
-    fe.preprocessor = fe.build_preprocessor(numeric_features, categorical_features)
+    # 4. Construir y aplicar pipeline (features derivados + preprocessor)
+    print("\n[4/5] Aplicando transformaciones...")
+    # Los features derivados se calculan dentro del pipeline (paso 'derive')
+    fe.preprocessor = fe.build_pipeline()
     X_train_transformed = fe.fit_transform(X_train)
     X_test_transformed = fe.transform(X_test)
     
-    # 6. Guardar preprocessor
+    # 5. Guardar preprocessor
     if save_preprocessor:
-        print("\n[6/6] Guardando preprocessor...")
+        print("\n[5/5] Guardando preprocessor...")
         fe.save_preprocessor()
     else:
-        print("\n[6/6] Preprocessor no guardado (save_preprocessor=False)")
+        print("\n[5/5] Preprocessor no guardado (save_preprocessor=False)")
     
     print("\n" + "=" * 80)
     print("✅ FEATURE ENGINEERING COMPLETADO")
@@ -15,11 +15,14 @@ from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field, validator
 from typing import List, Optional, Dict, Any
 import joblib
+from joblib import Parallel, delayed
 import pandas as pd
 import numpy as np
 import json
 import os
 import sys
+import time
+import threading
 from datetime import datetime
 import logging
 
@@ -33,6 +36,18 @@ logger = logging.getLogger(__name__)
 # Agregar directorio padre al path para imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Agregar src/ al path: el preprocessor serializado referencia a ft_engineering
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ft_engineering import add_derived_features, compute_ratios, DERIVED_FEATURES
+
+# Numba (opcional) para el kernel de imputación + escalado en lotes grandes
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 # ============================================================================
 # Configuración de la aplicación
 # ============================================================================
@@ -51,6 +66,28 @@ preprocessor = None
 feature_names = None
 config = None
 
+# Versión de los artefactos cargados (archivo y fecha de modificación de modelo y preprocessor)
+model_version = None
+
+# Modelos cuyo predict recorre X por columnas y se beneficia de un layout F-contiguo.
+# XGBoost, LightGBM y los árboles de scikit-learn recorren filas: se dejan en orden C.
+FORTRAN_ORDER_MODELS = {'LinearRegression', 'Ridge', 'Lasso', 'ElasticNet', 'SGDRegressor'}
+
+# Timestamp ISO cacheado para las respuestas (resolución de 250 ms)
+_ts_cache = {'v': '', 't': 0.0}
+
+# Parámetros ajustados del preprocessor para la transformación directa con NumPy
+fast_params = None
+
+# Buffer de trabajo por hilo para el preprocesamiento (se reutiliza entre requests).
+# Tiene un tamaño fijo: los lotes mayores usan un array temporal para que un
+# request grande no deje su memoria retenida en el hilo.
+_scratch = threading.local()
+SCRATCH_MAX_ROWS = 1024
+
+# Tamaño de lote a partir del cual se usa el kernel de Numba
+NUMBA_MIN_BATCH = 256
+
 # ============================================================================
 # Modelos de datos (Pydantic)
 # ============================================================================
@@ -93,6 +130,9 @@ class HousingFeatures(BaseModel):
             }
         }
 
+# Orden de columnas de entrada (se resuelve una sola vez al importar)
+FEATURE_FIELDS = list(HousingFeatures.model_fields)
+
 class BatchPredictionRequest(BaseModel):
     """Esquema para predicciones por lotes"""
     instances: List[HousingFeatures] = Field(..., description="Lista de instancias para predicción")
@@ -134,17 +174,263 @@ class HealthResponse(BaseModel):
     status: str = Field(..., description="Estado del servicio")
     model_loaded: bool = Field(..., description="Indica si el modelo está cargado")
     model_name: Optional[str] = Field(None, description="Nombre del modelo cargado")
+    model_version: Optional[str] = Field(None, description="Versión de los artefactos cargados (archivo y fecha de modificación)")
     timestamp: str = Field(..., description="Timestamp del health check")
 
 # ============================================================================
 # Funciones auxiliares
 # ============================================================================
 
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _standardize_kernel(X, median, mean, scale):
+        """
+        Imputa NaN con la mediana y estandariza el bloque numérico en el lugar,
+        en una sola pasada.
+        """
+        for i in range(X.shape[0]):
+            for j in range(mean.shape[0]):
+                v = X[i, j]
+                if np.isnan(v):
+                    v = median[j]
+                X[i, j] = (v - mean[j]) / scale[j]
+
+def _now_iso() -> str:
+    """
+    Devuelve el timestamp actual en formato ISO, refrescado como máximo cada 250 ms.
+    
+    Evita formatear datetime.now() en cada request de los endpoints de predicción.
+    """
+    t = time.time()
+    if t - _ts_cache['t'] > 0.25:
+        _ts_cache['v'] = datetime.fromtimestamp(t).isoformat()
+        _ts_cache['t'] = t
+    return _ts_cache['v']
+
+def find_latest_file(directory: str, prefix: str, suffix: str = '.pkl') -> Optional[str]:
+    """
+    Busca el archivo más reciente (por fecha de modificación) con el prefijo dado.
+    
+    Usa una sola pasada de os.scandir: DirEntry.stat() reutiliza la información
+    del listado y evita un stat adicional por archivo.
+    
+    Args:
+        directory: Directorio donde buscar
+        prefix: Prefijo del nombre de archivo
+        suffix: Extensión del archivo
+        
+    Returns:
+        Nombre del archivo más reciente, o None si no hay coincidencias
+    """
+    with os.scandir(directory) as it:
+        entries = [(entry.name, entry.stat().st_mtime) for entry in it
+                   if entry.name.startswith(prefix) and entry.name.endswith(suffix)]
+    
+    if not entries:
+        return None
+    
+    return max(entries, key=lambda entry: entry[1])[0]
+
+def build_fast_params(fitted_preprocessor) -> Optional[Dict[str, Any]]:
+    """
+    Extrae los parámetros ajustados del pipeline (medianas, media/escala y
+    categorías) para aplicar la transformación directamente con NumPy.
+    
+    Solo se habilita si el preprocessor tiene la estructura generada por
+    FeatureEngineer.build_pipeline y reproduce su salida sobre el ejemplo
+    del esquema de entrada.
+    
+    Args:
+        fitted_preprocessor: Pipeline de preprocesamiento ajustado
+        
+    Returns:
+        Diccionario con los parámetros, o None si se debe usar el preprocessor
+    """
+    try:
+        column_transformer = fitted_preprocessor.named_steps['prep']
+        numeric_steps = column_transformer.named_transformers_['num'].named_steps
+        imputer, scaler = numeric_steps['imputer'], numeric_steps['scaler']
+        onehot = column_transformer.named_transformers_['cat'].named_steps['onehot']
+        
+        columns = {name: list(cols) for name, _, cols in column_transformer.transformers_}
+        output_order = [name for name, _, _ in column_transformer.transformers_ if name != 'remainder']
+        remainder = [trans for name, trans, cols in column_transformer.transformers_
+                     if name == 'remainder' and len(cols) > 0 and trans != 'drop']
+        
+        numeric_features = columns['num']
+        raw_features = numeric_features[:-len(DERIVED_FEATURES)]
+        ratio_inputs = [raw_features.index(col) for col in
+                        ('total_rooms', 'total_bedrooms', 'population', 'households')]
+    except (AttributeError, KeyError, ValueError):
+        return None
+    
+    median = np.asarray(imputer.statistics_, dtype=np.float64)
+    
+    if (output_order != ['num', 'cat'] or remainder
+            or numeric_features[-len(DERIVED_FEATURES):] != DERIVED_FEATURES
+            or not set(raw_features) <= set(FEATURE_FIELDS)
+            or len(columns['cat']) != 1 or onehot.drop is not None
+            or imputer.add_indicator or np.isnan(median).any()):
+        return None
+    
+    n_numeric = len(numeric_features)
+    params = {
+        'raw_features': raw_features,
+        'ratio_inputs': ratio_inputs,
+        'categorical': columns['cat'][0],
+        'median': median,
+        'mean': np.array(scaler.mean_ if scaler.mean_ is not None else np.zeros(n_numeric), dtype=np.float64),
+        'scale': np.array(scaler.scale_ if scaler.scale_ is not None else np.ones(n_numeric), dtype=np.float64),
+        'categories': {category: i for i, category in enumerate(onehot.categories_[0])},
+        'n_features': n_numeric + len(onehot.categories_[0])
+    }
+    
+    # Verificar que el camino rápido reproduce la salida del preprocessor, también
+    # en las ramas de imputación (NaN) y de categoría desconocida
+    example_values = HousingFeatures.Config.schema_extra['example']
+    check_rows = [
+        example_values,
+        {**example_values, 'total_bedrooms': np.nan},
+        {**example_values, params['categorical']: '__CATEGORIA_DESCONOCIDA__'}
+    ]
+    check = pd.DataFrame(check_rows)
+    try:
+        expected = fitted_preprocessor.transform(check)
+    except ValueError as e:
+        logger.warning(f"El preprocessor no admite las filas de verificación ({e}). Se usará el preprocessor.")
+        return None
+    expected = expected.toarray() if hasattr(expected, 'toarray') else np.asarray(expected)
+    single = np.vstack([_fast_single(row, params) for row in check_rows])
+    if not (np.allclose(_fast_preprocess(check, params), expected, equal_nan=True)
+            and np.allclose(single, expected, equal_nan=True)):
+        logger.warning("La transformación directa no coincide con el preprocessor. Se usará el preprocessor.")
+        return None
+    
+    return params
+
+def _fast_preprocess(input_data: pd.DataFrame, params: Dict[str, Any]) -> np.ndarray:
+    """
+    Aplica features derivados, imputación, escalado y one-hot con NumPy sobre
+    el buffer de trabajo del hilo, sin pasar por ColumnTransformer.
+    
+    Hasta SCRATCH_MAX_ROWS filas, el array devuelto es una vista del buffer:
+    debe consumirse (predict) antes del siguiente preprocesamiento en el
+    mismo hilo. Los lotes mayores se transforman sobre un array temporal.
+    
+    Args:
+        input_data: DataFrame con los datos de entrada
+        params: Parámetros extraídos por build_fast_params
+        
+    Returns:
+        Array numpy con los datos preprocesados
+    """
+    n_rows = len(input_data)
+    if n_rows > SCRATCH_MAX_ROWS:
+        X = np.empty((n_rows, params['n_features']), dtype=np.float64)
+    else:
+        buf = getattr(_scratch, 'buf', None)
+        if buf is None or buf.shape[1] != params['n_features']:
+            buf = _scratch.buf = np.empty((SCRATCH_MAX_ROWS, params['n_features']), dtype=np.float64)
+        X = buf[:n_rows]
+    
+    for j, col in enumerate(params['raw_features']):
+        X[:, j] = input_data[col].to_numpy(dtype=np.float64, copy=False)
+    
+    categories = params['categories']
+    codes = np.fromiter((categories.get(value, -1) for value in input_data[params['categorical']]),
+                        dtype=np.intp, count=n_rows)
+    
+    return _transform_block(X, codes, params)
+
+def _fast_single(values: Dict[str, Any], params: Dict[str, Any]) -> np.ndarray:
+    """
+    Transforma una sola instancia directamente desde el dict de valores validados,
+    sin construir DataFrame ni pasar por ColumnTransformer.
+    
+    Args:
+        values: Valores de la instancia (campo -> valor)
+        params: Parámetros extraídos por build_fast_params
+        
+    Returns:
+        Array numpy de forma (1, n_features)
+    """
+    X = np.empty((1, params['n_features']), dtype=np.float64)
+    
+    for j, col in enumerate(params['raw_features']):
+        X[0, j] = values[col]
+    
+    codes = np.array([params['categories'].get(values[params['categorical']], -1)], dtype=np.intp)
+    
+    return _transform_block(X, codes, params)
+
+def _transform_block(X: np.ndarray, codes: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    """
+    Completa en el lugar un bloque con las columnas originales ya cargadas:
+    features derivados, imputación, escalado y one-hot.
+    
+    Args:
+        X: Array (n, n_features) con las columnas originales al inicio
+        codes: Índice de categoría por fila (-1 si es desconocida)
+        params: Parámetros extraídos por build_fast_params
+        
+    Returns:
+        El mismo array X transformado
+    """
+    # Bloque numérico: columnas originales + features derivados
+    n_raw = len(params['raw_features'])
+    n_numeric = n_raw + len(DERIVED_FEATURES)
+    compute_ratios(*(X[:, j] for j in params['ratio_inputs']), out=X[:, n_raw:n_numeric])
+    
+    numeric = X[:, :n_numeric]
+    if NUMBA_AVAILABLE and X.shape[0] >= NUMBA_MIN_BATCH:
+        # Lotes grandes: imputación + escalado en una sola pasada compilada
+        _standardize_kernel(numeric, params['median'], params['mean'], params['scale'])
+    else:
+        nan_rows, nan_cols = np.nonzero(np.isnan(numeric))
+        if len(nan_rows):
+            numeric[nan_rows, nan_cols] = params['median'][nan_cols]
+        numeric -= params['mean']
+        numeric /= params['scale']
+    
+    # Bloque categórico: un 1 por fila (categorías desconocidas quedan en cero)
+    onehot = X[:, n_numeric:]
+    onehot.fill(0.0)
+    rows = np.flatnonzero(codes >= 0)
+    onehot[rows, codes[rows]] = 1.0
+    
+    return X
+
+def _artifact_version(path: str) -> str:
+    """Identifica un artefacto serializado por su nombre y fecha de modificación"""
+    return f"{os.path.basename(path)}@{int(os.path.getmtime(path))}"
+
+def _load_model(model_path: str):
+    """
+    Carga el modelo serializado.
+    
+    mmap_mode='r': los arrays numpy se mapean en memoria de solo lectura y las
+    páginas se comparten entre workers de uvicorn.
+    """
+    return joblib.load(model_path, mmap_mode='r')
+
+def _load_preprocessor(preprocessor_path: str):
+    """
+    Carga el preprocessor serializado.
+    
+    Returns:
+        Tupla (preprocessor, feature_names); feature_names es None si no se guardaron
+    """
+    preprocessor_data = joblib.load(preprocessor_path, mmap_mode='r')
+    
+    if isinstance(preprocessor_data, dict):
+        return preprocessor_data['preprocessor'], preprocessor_data['feature_names']
+    return preprocessor_data, None
+
 def load_model_and_config():
     """
     Carga el modelo entrenado, preprocessor y configuración.
     """
-    global model, preprocessor, feature_names, config
+    global model, preprocessor, feature_names, config, fast_params, model_version
     
     try:
         # Cargar configuración
@@ -156,41 +442,46 @@ def load_model_and_config():
         model_dir = os.path.join(os.path.dirname(__file__), '..', 
                                  config.get('model_output_dir', 'models/'))
         
-        # Buscar el último modelo guardado
-        model_files = [f for f in os.listdir(model_dir) if f.startswith('best_model_') and f.endswith('.pkl')]
+        # Buscar el último modelo guardado (el más reciente por fecha de modificación)
+        model_file = find_latest_file(model_dir, 'best_model_')
         
-        if not model_files:
+        if model_file is None:
             raise FileNotFoundError(f"No se encontraron modelos en {model_dir}")
         
-        # Ordenar por fecha de modificación y tomar el más reciente
-        model_files.sort(key=lambda x: os.path.getmtime(os.path.join(model_dir, x)), reverse=True)
-        latest_model_file = os.path.join(model_dir, model_files[0])
-        
-        # Cargar modelo
-        model = joblib.load(latest_model_file)
-        logger.info(f"Modelo cargado exitosamente: {model_files[0]}")
+        latest_model_file = os.path.join(model_dir, model_file)
         
         # Buscar preprocessor
-        preprocessor_files = [f for f in os.listdir(model_dir) 
-                             if f.startswith('preprocessor_') and f.endswith('.pkl')]
+        preprocessor_file = find_latest_file(model_dir, 'preprocessor_')
         
-        if preprocessor_files:
-            preprocessor_files.sort(key=lambda x: os.path.getmtime(os.path.join(model_dir, x)), reverse=True)
-            preprocessor_path = os.path.join(model_dir, preprocessor_files[0])
-            preprocessor_data = joblib.load(preprocessor_path)
+        if preprocessor_file is not None:
+            # Cargar modelo y preprocessor en paralelo (hilos: la lectura de arrays libera el GIL)
+            preprocessor_path = os.path.join(model_dir, preprocessor_file)
+            model, (preprocessor, feature_names) = Parallel(n_jobs=2, prefer='threads')([
+                delayed(_load_model)(latest_model_file),
+                delayed(_load_preprocessor)(preprocessor_path)
+            ])
+            model_version = f"{_artifact_version(latest_model_file)}+{_artifact_version(preprocessor_path)}"
+        else:
+            model = _load_model(latest_model_file)
+            preprocessor = None
+            feature_names = None
+            model_version = _artifact_version(latest_model_file)
+        
+        logger.info(f"Modelo cargado exitosamente: {model_file} (versión {model_version})")
+        
+        if preprocessor is not None:
+            # En inferencia cada request trae pocas filas: evitar el overhead de workers de joblib
+            column_transformer = getattr(preprocessor, 'named_steps', {}).get('prep', preprocessor)
+            if hasattr(column_transformer, 'n_jobs'):
+                column_transformer.n_jobs = 1
             
-            if isinstance(preprocessor_data, dict):
-                preprocessor = preprocessor_data['preprocessor']
-                feature_names = preprocessor_data['feature_names']
-            else:
-                preprocessor = preprocessor_data
-                feature_names = None
+            fast_params = build_fast_params(preprocessor)
             
-            logger.info(f"Preprocessor cargado exitosamente: {preprocessor_files[0]}")
+            logger.info(f"Preprocessor cargado exitosamente: {preprocessor_file}")
+            logger.info(f"Transformación directa con NumPy: {'Activa' if fast_params else 'No disponible'}")
         else:
             logger.warning("No se encontró preprocessor. Se usará el modelo directamente.")
-            preprocessor = None
-            feature_names = None
+            fast_params = None
         
         return True
         
@@ -209,21 +500,29 @@ def preprocess_input(input_data: pd.DataFrame) -> np.ndarray:
         Array numpy con los datos preprocesados
     """
     try:
-        # Crear features derivados (misma lógica que en ft_engineering.py)
-        df = input_data.copy()
-        
-        # Features derivados
-        df['rooms_per_household'] = df['total_rooms'] / df['households']
-        df['bedrooms_per_room'] = df['total_bedrooms'] / df['total_rooms']
-        df['population_per_household'] = df['population'] / df['households']
-        
-        if preprocessor is not None:
-            # Usar preprocessor si está disponible
-            X_processed = preprocessor.transform(df)
+        if fast_params is not None:
+            # Transformación directa con NumPy sobre el buffer reutilizable del hilo
+            X_processed = _fast_preprocess(input_data, fast_params)
+        elif preprocessor is not None and 'derive' in getattr(preprocessor, 'named_steps', {}):
+            # El pipeline completo (paso 'derive') ya calcula los features derivados
+            X_processed = preprocessor.transform(input_data)
         else:
-            # Si no hay preprocessor, convertir directamente a array
-            # (esto requeriría que el modelo acepte datos sin procesar)
-            X_processed = df.values
+            # Preprocessors anteriores: crear features derivados (misma lógica que en ft_engineering.py)
+            df = add_derived_features(input_data)
+            
+            if preprocessor is not None:
+                # Usar preprocessor si está disponible
+                X_processed = preprocessor.transform(df)
+            else:
+                # Si no hay preprocessor, convertir directamente a array
+                # (esto requeriría que el modelo acepte datos sin procesar)
+                X_processed = df.values
+        
+        # Para lotes, entregar layout por columnas a los modelos que lo aprovechan
+        if (isinstance(X_processed, np.ndarray) and X_processed.shape[0] > 1
+                and X_processed.flags.c_contiguous
+                and type(model).__name__ in FORTRAN_ORDER_MODELS):
+            X_processed = np.asfortranarray(X_processed)
         
         return X_processed
         
@@ -296,7 +595,8 @@ async def health_check():
         status="healthy" if is_healthy else "unhealthy",
         model_loaded=is_healthy,
         model_name=type(model).__name__ if is_healthy else None,
-        timestamp=datetime.now().isoformat()
+        model_version=model_version if is_healthy else None,
+        timestamp=_now_iso()
     )
 
 @app.post("/predict", response_model=PredictionResponse, tags=["Prediction"])
@@ -317,12 +617,17 @@ async def predict(features: HousingFeatures):
         )
     
     try:
-        # Convertir entrada a DataFrame
-        input_dict = features.dict()
-        input_df = pd.DataFrame([input_dict])
+        # Convertir entrada a DataFrame (dict de columnas: evita el constructor por filas)
+        values = features.__dict__
         
-        # Preprocesar datos
-        X_processed = preprocess_input(input_df)
+        if fast_params is not None:
+            # Fila única: transformación directa desde los valores validados, sin DataFrame
+            X_processed = _fast_single(values, fast_params)
+        else:
+            input_df = pd.DataFrame({field: [values[field]] for field in FEATURE_FIELDS})
+            
+            # Preprocesar datos
+            X_processed = preprocess_input(input_df)
         
         # Realizar predicción
         prediction = float(model.predict(X_processed)[0])
@@ -332,7 +637,7 @@ async def predict(features: HousingFeatures):
         return PredictionResponse(
             prediction=prediction,
             model_name=type(model).__name__,
-            timestamp=datetime.now().isoformat()
+            timestamp=_now_iso()
         )
         
     except Exception as e:
@@ -360,16 +665,19 @@ async def predict_batch(request: BatchPredictionRequest):
         )
     
     try:
-        # Convertir lista de instancias a DataFrame
-        instances_dict = [instance.dict() for instance in request.instances]
-        input_df = pd.DataFrame(instances_dict)
+        # Convertir lista de instancias a DataFrame por columnas (sin dicts por fila ni transposición).
+        # Los valores ya validados se leen de __dict__, sin pasar por la serialización .dict()
+        instance_values = [instance.__dict__ for instance in request.instances]
+        columns = {field: [values[field] for values in instance_values]
+                   for field in FEATURE_FIELDS}
+        input_df = pd.DataFrame(columns, copy=False)
         
         # Preprocesar datos
         X_processed = preprocess_input(input_df)
         
         # Realizar predicciones
         predictions = model.predict(X_processed)
-        predictions_list = [float(p) for p in predictions]
+        predictions_list = np.asarray(predictions).astype(np.float64, copy=False).tolist()
         
         logger.info(f"Predicciones por lotes realizadas: {len(predictions_list)} instancias")
         
@@ -377,7 +685,7 @@ async def predict_batch(request: BatchPredictionRequest):
             predictions=predictions_list,
             model_name=type(model).__name__,
             count=len(predictions_list),
-            timestamp=datetime.now().isoformat()
+            timestamp=_now_iso()
         )
         
     except Exception as e:
@@ -10,9 +10,19 @@ Fecha: Noviembre 2025
 """
 
 import streamlit as st
-import requests
-import json
 import pandas as pd
+import os
+import sys
+import time
+
+# Agregar src/ al path para las utilidades compartidas con streamlit_predict.py
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from streamlit_common import (
+    OCEAN_PROXIMITY_OPTIONS, VALID_OCEAN_PROXIMITY, check_api_health,
+    compute_derived_metrics, show_prediction, submit_prediction,
+    verify_api_contract, warm_up_api
+)
 
 # ============================================================================
 # Configuración de la página
@@ -25,40 +35,6 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# ============================================================================
-# Variables globales
-# ============================================================================
-
-API_URL = "http://localhost:8000"
-
-# ============================================================================
-# Funciones auxiliares
-# ============================================================================
-
-def check_api_status():
-    """Verifica si la API está disponible"""
-    try:
-        response = requests.get(f"{API_URL}/health", timeout=2)
-        return response.status_code == 200
-    except:
-        return False
-
-def make_prediction(features):
-    """Hace una predicción usando la API"""
-    try:
-        response = requests.post(
-            f"{API_URL}/predict",
-            json=features,
-            timeout=5
-        )
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            return {"error": f"Error {response.status_code}: {response.text}"}
-    except Exception as e:
-        return {"error": str(e)}
-
 # ============================================================================
 # Interfaz principal
 # ============================================================================
@@ -68,15 +44,24 @@ st.title("🏠 Predicción de Precios de Viviendas en California")
 st.markdown("---")
 
 # Verificar estado de la API
-api_status = check_api_status()
+api_status = check_api_health() and verify_api_contract()
 
-if not api_status:
+if api_status:
+    st.session_state["last_api_ok"] = time.time()
+    warm_up_api()
+    st.success("✅ API conectada correctamente")
+elif "last_api_ok" in st.session_state:
+    # La API ya respondió en esta sesión: se mantiene la interfaz con un aviso
+    elapsed = time.time() - st.session_state["last_api_ok"]
+    st.warning(
+        f"⚠️ La API no responde (último contacto correcto hace {elapsed:.0f} s). "
+        "Se muestran los últimos datos conocidos."
+    )
+else:
     st.error("⚠️ La API de predicción no está disponible. Asegúrate de que esté corriendo en http://localhost:8000")
     st.info("💡 Para iniciar la API, ejecuta: `uvicorn model_deploy:app --host 0.0.0.0 --port 8000`")
     st.stop()
 
-st.success("✅ API conectada correctamente")
-
 # ============================================================================
 # Sidebar con información
 # ============================================================================
@@ -106,126 +91,143 @@ with st.sidebar:
 
 st.header("📝 Datos de la Vivienda")
 
-col1, col2 = st.columns(2)
+# Formulario: los cambios en los campos solo provocan un rerun al enviarlo
+with st.form("housing_form"):
+    col1, col2 = st.columns(2)
 
-with col1:
-    st.subheader("📍 Ubicación")
-    longitude = st.number_input(
-        "Longitud",
-        min_value=-125.0,
-        max_value=-114.0,
-        value=-122.23,
-        step=0.01,
-        help="Coordenada de longitud geográfica"
-    )
+    with col1:
+        st.subheader("📍 Ubicación")
+        longitude = st.number_input(
+            "Longitud",
+            min_value=-125.0,
+            max_value=-114.0,
+            value=-122.23,
+            step=0.01,
+            help="Coordenada de longitud geográfica"
+        )
     
-    latitude = st.number_input(
-        "Latitud",
-        min_value=32.0,
-        max_value=42.0,
-        value=37.88,
-        step=0.01,
-        help="Coordenada de latitud geográfica"
-    )
+        latitude = st.number_input(
+            "Latitud",
+            min_value=32.0,
+            max_value=42.0,
+            value=37.88,
+            step=0.01,
+            help="Coordenada de latitud geográfica"
+        )
     
-    ocean_proximity = st.selectbox(
-        "Proximidad al Océano",
-        options=['<1H OCEAN', 'INLAND', 'NEAR OCEAN', 'NEAR BAY', 'ISLAND'],
-        index=3,
-        help="Categoría de proximidad al océano"
-    )
+        ocean_proximity = st.selectbox(
+            "Proximidad al Océano",
+            options=OCEAN_PROXIMITY_OPTIONS,
+            index=3,
+            help="Categoría de proximidad al océano"
+        )
     
-    st.subheader("🏘️ Características del Área")
+        st.subheader("🏘️ Características del Área")
     
-    population = st.number_input(
-        "Población",
-        min_value=1,
-        max_value=50000,
-        value=322,
-        step=1,
-        help="Población total del área"
-    )
+        population = st.number_input(
+            "Población",
+            min_value=1,
+            max_value=50000,
+            value=322,
+            step=1,
+            help="Población total del área"
+        )
     
-    households = st.number_input(
-        "Hogares",
-        min_value=1,
-        max_value=10000,
-        value=126,
-        step=1,
-        help="Número de hogares en el área"
-    )
+        households = st.number_input(
+            "Hogares",
+            min_value=1,
+            max_value=10000,
+            value=126,
+            step=1,
+            help="Número de hogares en el área"
+        )
 
-with col2:
-    st.subheader("🏠 Características de la Vivienda")
+    with col2:
+        st.subheader("🏠 Características de la Vivienda")
     
-    housing_median_age = st.slider(
-        "Edad Mediana de las Viviendas (años)",
-        min_value=1,
-        max_value=100,
-        value=41,
-        help="Edad mediana de las viviendas en el área"
-    )
+        housing_median_age = st.slider(
+            "Edad Mediana de las Viviendas (años)",
+            min_value=1,
+            max_value=100,
+            value=41,
+            help="Edad mediana de las viviendas en el área"
+        )
     
-    total_rooms = st.number_input(
-        "Total de Habitaciones",
-        min_value=1,
-        max_value=50000,
-        value=880,
-        step=1,
-        help="Número total de habitaciones"
-    )
+        total_rooms = st.number_input(
+            "Total de Habitaciones",
+            min_value=1,
+            max_value=50000,
+            value=880,
+            step=1,
+            help="Número total de habitaciones"
+        )
     
-    total_bedrooms = st.number_input(
-        "Total de Dormitorios",
-        min_value=1,
-        max_value=10000,
-        value=129,
-        step=1,
-        help="Número total de dormitorios"
-    )
+        total_bedrooms = st.number_input(
+            "Total de Dormitorios",
+            min_value=1,
+            max_value=10000,
+            value=129,
+            step=1,
+            help="Número total de dormitorios"
+        )
     
-    st.subheader("💰 Datos Económicos")
+        st.subheader("💰 Datos Económicos")
     
-    median_income = st.number_input(
-        "Ingreso Mediano (en $10,000)",
-        min_value=0.0,
-        max_value=20.0,
-        value=8.33,
-        step=0.01,
-        help="Ingreso mediano en unidades de $10,000 USD"
-    )
+        median_income = st.number_input(
+            "Ingreso Mediano (en $10,000)",
+            min_value=0.0,
+            max_value=20.0,
+            value=8.33,
+            step=0.01,
+            help="Ingreso mediano en unidades de $10,000 USD"
+        )
+
+    
+    submitted = st.form_submit_button("🔮 Predecir Precio", type="primary", use_container_width=True)
 
 st.markdown("---")
 
 # ============================================================================
-# Botón de predicción
+# Predicción
 # ============================================================================
 
-if st.button("🔮 Predecir Precio", type="primary", use_container_width=True):
-    
-    # Preparar datos
-    features = {
-        "longitude": longitude,
-        "latitude": latitude,
-        "housing_median_age": housing_median_age,
-        "total_rooms": total_rooms,
-        "total_bedrooms": total_bedrooms,
-        "population": population,
-        "households": households,
-        "median_income": median_income,
-        "ocean_proximity": ocean_proximity
-    }
-    
-    # Hacer predicción
-    with st.spinner("Realizando predicción..."):
-        result = make_prediction(features)
+# Preparar datos (en cada rerun, para compararlos con la última predicción)
+features = {
+    "longitude": longitude,
+    "latitude": latitude,
+    "housing_median_age": housing_median_age,
+    "total_rooms": total_rooms,
+    "total_bedrooms": total_bedrooms,
+    "population": population,
+    "households": households,
+    "median_income": median_income,
+    "ocean_proximity": ocean_proximity
+}
+
+if submitted:
+    # Una categoría inválida se rechaza aquí, sin ida y vuelta a la API
+    if features["ocean_proximity"] not in VALID_OCEAN_PROXIMITY:
+        st.error(f"❌ Categoría de proximidad al océano inválida: {features['ocean_proximity']}")
+        st.stop()
     
-    # Mostrar resultado
+    # Enviar la predicción sin bloquear el script
+    st.session_state["pending_prediction"] = (features, submit_prediction(features))
+
+# ============================================================================
+# Resultado de la predicción
+# ============================================================================
+
+def render_prediction(features, result):
+    """Muestra el resultado de una predicción"""
     if "error" in result:
         st.error(f"❌ Error: {result['error']}")
     else:
         prediction = result.get("prediction", 0)
         model_name = result.get("model_name", "Unknown")
+        derived = compute_derived_metrics(
+            features["total_rooms"], features["total_bedrooms"], features["population"],
+            features["households"], features["median_income"], prediction
+        )
         
         # Mostrar predicción destacada
         st.success("✅ Predicción completada")
@@ -249,11 +251,10 @@ if st.button("🔮 Predecir Precio", type="primary", use_container_width=True):
             )
         
         with col_pred3:
-            # Calcular precio por habitación
-            price_per_room = prediction / total_rooms if total_rooms > 0 else 0
+            # Precio por habitación
             st.metric(
                 label="📊 Precio/Habitación",
-                value=f"${price_per_room:,.2f}"
+                value=f"${derived.price_per_room:,.2f}"
             )
         
         # Información adicional
@@ -262,15 +263,15 @@ if st.button("🔮 Predecir Precio", type="primary", use_container_width=True):
         
         # Crear DataFrame con los datos ingresados
         input_data = pd.DataFrame([{
-            "Longitud": longitude,
-            "Latitud": latitude,
-            "Edad Viviendas (años)": housing_median_age,
-            "Total Habitaciones": total_rooms,
-            "Total Dormitorios": total_bedrooms,
-            "Población": population,
-            "Hogares": households,
-            "Ingreso Mediano": f"${median_income * 10000:,.0f}",
-            "Proximidad Océano": ocean_proximity
+            "Longitud": features["longitude"],
+            "Latitud": features["latitude"],
+            "Edad Viviendas (años)": features["housing_median_age"],
+            "Total Habitaciones": features["total_rooms"],
+            "Total Dormitorios": features["total_bedrooms"],
+            "Población": features["population"],
+            "Hogares": features["households"],
+            "Ingreso Mediano": f"${derived.income_usd:,.0f}",
+            "Proximidad Océano": features["ocean_proximity"]
         }])
         
         st.dataframe(input_data.T, use_container_width=True)
@@ -280,26 +281,22 @@ if st.button("🔮 Predecir Precio", type="primary", use_container_width=True):
         col_met1, col_met2, col_met3 = st.columns(3)
         
         with col_met1:
-            rooms_per_household = total_rooms / households if households > 0 else 0
-            st.metric("Habitaciones/Hogar", f"{rooms_per_household:.2f}")
+            st.metric("Habitaciones/Hogar", f"{derived.rooms_per_household:.2f}")
         
         with col_met2:
-            bedrooms_per_room = total_bedrooms / total_rooms if total_rooms > 0 else 0
-            st.metric("Dormitorios/Habitación", f"{bedrooms_per_room:.2%}")
+            st.metric("Dormitorios/Habitación", f"{derived.bedrooms_per_room:.2%}")
         
         with col_met3:
-            population_per_household = population / households if households > 0 else 0
-            st.metric("Población/Hogar", f"{population_per_household:.2f}")
+            st.metric("Población/Hogar", f"{derived.population_per_household:.2f}")
+
+show_prediction(features, render_prediction)
 
 # ============================================================================
 # Footer
 # ============================================================================
 
 st.markdown("---")
-st.markdown("""
-<div style='text-align: center; color: gray; padding: 20px;'>
-    <p>🏠 <strong>California Housing Price Prediction</strong></p>
-    <p>MLOps Pipeline Project | Noviembre 2025</p>
-    <p>Modelo: XGBoost Regressor | API: FastAPI</p>
-</div>
-""", unsafe_allow_html=True)
+st.caption(
+    "🏠 **California Housing Price Prediction** | MLOps Pipeline Project | Noviembre 2025 | "
+    "Modelo: XGBoost Regressor | API: FastAPI"
+)
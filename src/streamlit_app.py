@@ -12,13 +12,11 @@ Fecha: Noviembre 2025
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
-import json
+import orjson
+import io
 import os
 from datetime import datetime
-import glob
+from types import SimpleNamespace
 
 # Configuración de la página
 st.set_page_config(
@@ -28,6 +26,406 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# ============================================================================
+# Carga de datos (cacheada entre reruns)
+# ============================================================================
+
+@st.cache_data(ttl=10, show_spinner=False)
+def list_monitoring_files(monitoring_dir):
+    """Lista los reportes de drift y alertas, del más reciente al más antiguo"""
+    drift_files, alert_files = [], []
+    
+    # Una sola pasada por el directorio, clasificando por prefijo
+    with os.scandir(monitoring_dir) as entries:
+        for entry in entries:
+            name = entry.name
+            if name.startswith('drift_summary_') and name.endswith('.csv'):
+                drift_files.append(entry.path)
+            elif name.startswith('alerts_') and name.endswith('.json'):
+                alert_files.append(entry.path)
+    
+    drift_files.sort(reverse=True)
+    alert_files.sort(reverse=True)
+    return drift_files, alert_files
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_drift_summary(path, mtime):
+    """Carga un reporte de drift (mtime invalida la caché si el archivo cambia)"""
+    return pd.read_csv(path)
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_alerts(path, mtime):
+    """Carga un archivo de alertas (mtime invalida la caché si el archivo cambia)"""
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
+
+@st.cache_data(show_spinner=False)
+def summarize_drift(drift_summary):
+    """
+    Precalcula las agregaciones del reporte que no dependen de los umbrales.
+
+    Args:
+        drift_summary: DataFrame con las métricas de drift por feature
+
+    Returns:
+        SimpleNamespace con los top 10 por métrica, conteos, promedios y
+        el array de drift scores para contar por umbral
+    """
+    return SimpleNamespace(
+        total_features=len(drift_summary),
+        drift_scores=drift_summary['drift_score'].to_numpy(),
+        top_drift=drift_summary.nlargest(10, 'drift_score'),
+        top_psi=drift_summary.nlargest(10, 'psi'),
+        top_js=drift_summary.nlargest(10, 'js_divergence'),
+        top_ks=drift_summary.nlargest(10, 'ks_statistic'),
+        risk_counts=drift_summary['risk_level'].value_counts(),
+        avg_psi=drift_summary['psi'].mean(),
+        avg_js=drift_summary['js_divergence'].mean(),
+        avg_drift_score=drift_summary['drift_score'].mean(),
+        ks_drift_count=int(drift_summary['ks_drift'].sum())
+    )
+
+@st.cache_data(show_spinner=False)
+def to_csv_bytes(df):
+    """Serializa un DataFrame a CSV directamente en bytes (una vez por filtro)"""
+    buffer = io.BytesIO()
+    df.to_csv(buffer, index=False)
+    return buffer.getvalue()
+
+# ============================================================================
+# Figuras (cacheadas por el fragmento de datos que usan)
+# ============================================================================
+# plotly se importa dentro de cada builder: si no hay reportes el script
+# termina antes de dibujar nada y el arranque se ahorra su importación.
+
+@st.cache_data(show_spinner=False)
+def build_risk_pie(risk_counts):
+    """Pie chart de distribución de features por nivel de riesgo"""
+    import plotly.graph_objects as go
+
+    fig = go.Figure(data=[go.Pie(
+        labels=risk_counts.index,
+        values=risk_counts.values,
+        hole=0.3,
+        marker=dict(colors=['green', 'yellow', 'orange', 'red'])
+    )])
+    fig.update_layout(title="Distribución de Features por Nivel de Riesgo")
+    return fig
+
+@st.cache_data(show_spinner=False)
+def build_top_drift_bar(top_drift):
+    """Bar chart de los 10 features con mayor drift score"""
+    import plotly.graph_objects as go
+
+    fig = go.Figure(data=[go.Bar(
+        x=top_drift['feature'],
+        y=top_drift['drift_score'],
+        marker=dict(
+            color=top_drift['drift_score'],
+            colorscale='Reds',
+            showscale=True,
+            colorbar=dict(title="Drift Score")
+        )
+    )])
+    fig.update_layout(
+        title="Top 10 Features con Mayor Drift",
+        xaxis_title="Feature",
+        yaxis_title="Drift Score",
+        xaxis_tickangle=-45
+    )
+    return fig
+
+@st.cache_data(show_spinner=False)
+def build_metric_histogram(values, metric, title, label, moderate, critical):
+    """
+    Histograma de una métrica de drift con sus umbrales.
+
+    Args:
+        values: DataFrame con solo la columna de la métrica
+        metric: Nombre de la columna
+        title: Título del gráfico
+        label: Etiqueta del eje x
+        moderate: Umbral moderado (línea amarilla)
+        critical: Umbral crítico (línea roja)
+    """
+    import plotly.express as px
+
+    fig = px.histogram(
+        values, 
+        x=metric, 
+        nbins=30,
+        title=title,
+        labels={metric: label}
+    )
+    fig.add_vline(x=moderate, line_dash="dash", line_color="yellow", 
+                  annotation_text="Umbral Moderado")
+    fig.add_vline(x=critical, line_dash="dash", line_color="red", 
+                  annotation_text="Umbral Crítico")
+    return fig
+
+@st.cache_data(show_spinner=False)
+def build_top_metric_bar(top, metric, title):
+    """Bar chart de los 10 features con mayor valor de una métrica continua"""
+    import plotly.express as px
+
+    fig = px.bar(
+        top,
+        x='feature',
+        y=metric,
+        title=title,
+        color=metric,
+        color_continuous_scale='Reds'
+    )
+    fig.update_layout(xaxis_tickangle=-45)
+    return fig
+
+@st.cache_data(show_spinner=False)
+def build_ks_pie(ks_drift_count, total_features):
+    """Pie chart de features con y sin drift según el KS test"""
+    import plotly.graph_objects as go
+
+    fig = go.Figure(data=[go.Pie(
+        labels=['Drift Detectado', 'Sin Drift'],
+        values=[ks_drift_count, total_features - ks_drift_count],
+        hole=0.3,
+        marker=dict(colors=['red', 'green'])
+    )])
+    fig.update_layout(title="KS Test - Detección de Drift")
+    return fig
+
+@st.cache_data(show_spinner=False)
+def build_top_ks_bar(top_ks):
+    """Bar chart de los 10 features con mayor estadístico KS"""
+    import plotly.express as px
+
+    fig = px.bar(
+        top_ks,
+        x='feature',
+        y='ks_statistic',
+        title="Top 10 Features por KS Statistic",
+        color='ks_drift',
+        color_discrete_map={True: 'red', False: 'green'}
+    )
+    fig.update_layout(xaxis_tickangle=-45)
+    return fig
+
+# ============================================================================
+# Secciones del dashboard
+# ============================================================================
+# Cada sección es un fragmento: sus widgets solo re-ejecutan la propia sección
+
+# Elemento de Streamlit con el que se muestra cada nivel de alerta (st.success por defecto)
+ALERT_RENDERERS = {
+    '🔴 CRÍTICO': st.error,
+    '🟠 ALTO': st.warning,
+    '🟡 MODERADO': st.info
+}
+
+@st.fragment
+def render_executive_summary(summary, alerts_data, threshold_critical):
+    """Sección 1: Resumen ejecutivo y alertas activas"""
+    st.header("🎯 Resumen Ejecutivo")
+
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric("Total Features", summary.total_features)
+
+    with col2:
+        critical_count = int(np.count_nonzero(summary.drift_scores >= threshold_critical))
+        st.metric("Features Críticos", critical_count, 
+                 delta=None if critical_count == 0 else "⚠️",
+                 delta_color="inverse")
+
+    with col3:
+        st.metric("PSI Promedio", f"{summary.avg_psi:.4f}")
+
+    with col4:
+        st.metric("JS Div Promedio", f"{summary.avg_js:.4f}")
+
+    # Mostrar alertas si existen
+    if alerts_data:
+        st.markdown("### 🚨 Alertas Activas")
+        for alert in alerts_data.get('alerts', ()):
+            render_alert = ALERT_RENDERERS.get(alert['level'], st.success)
+            render_alert(f"**{alert['level']}**: {alert['message']}\n\n"
+                         f"**Recomendación**: {alert['recommendation']}")
+
+
+@st.fragment
+def render_risk_distribution(summary):
+    """Sección 2: Distribución de riesgo y top features con drift"""
+    st.header("📊 Distribución de Riesgo")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        # Pie chart de distribución de riesgo
+        st.plotly_chart(build_risk_pie(summary.risk_counts), use_container_width=True)
+
+    with col2:
+        # Bar chart de top 10 features
+        st.plotly_chart(build_top_drift_bar(summary.top_drift), use_container_width=True)
+
+@st.fragment
+def render_metric_details(drift_summary, summary):
+    """Sección 3: Análisis detallado por métrica (PSI, JS, KS)"""
+    st.header("🔍 Análisis Detallado por Métrica")
+
+    tab1, tab2, tab3 = st.tabs(["📈 PSI", "📉 Jensen-Shannon", "📊 KS Test"])
+
+    with tab1:
+        col1, col2 = st.columns(2)
+        with col1:
+            # Histograma de PSI
+            fig_psi_hist = build_metric_histogram(
+                drift_summary[['psi']], 'psi', "Distribución de PSI",
+                'Population Stability Index', 0.1, 0.2
+            )
+            st.plotly_chart(fig_psi_hist, use_container_width=True)
+
+        with col2:
+            # Top features por PSI
+            fig_psi_bar = build_top_metric_bar(summary.top_psi, 'psi', "Top 10 Features por PSI")
+            st.plotly_chart(fig_psi_bar, use_container_width=True)
+
+    with tab2:
+        col1, col2 = st.columns(2)
+        with col1:
+            # Histograma de JS Divergence
+            fig_js_hist = build_metric_histogram(
+                drift_summary[['js_divergence']], 'js_divergence',
+                "Distribución de Jensen-Shannon Divergence", 'JS Divergence', 0.1, 0.3
+            )
+            st.plotly_chart(fig_js_hist, use_container_width=True)
+
+        with col2:
+            # Top features por JS
+            fig_js_bar = build_top_metric_bar(
+                summary.top_js, 'js_divergence', "Top 10 Features por JS Divergence"
+            )
+            st.plotly_chart(fig_js_bar, use_container_width=True)
+
+    with tab3:
+        col1, col2 = st.columns(2)
+        with col1:
+            # KS Test - Features con drift detectado
+            fig_ks_pie = build_ks_pie(summary.ks_drift_count, summary.total_features)
+            st.plotly_chart(fig_ks_pie, use_container_width=True)
+
+        with col2:
+            # Top features por KS statistic
+            st.plotly_chart(build_top_ks_bar(summary.top_ks), use_container_width=True)
+
+@st.fragment
+def render_detail_table(drift_summary, timestamp):
+    """Sección 4: Tabla detallada con filtros y descarga"""
+    st.header("📋 Tabla Detallada de Drift por Feature")
+
+    # Filtros
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        risk_filter = st.multiselect(
+            "Filtrar por nivel de riesgo:",
+            options=drift_summary['risk_level'].unique(),
+            default=drift_summary['risk_level'].unique()
+        )
+    with col2:
+        psi_filter = st.multiselect(
+            "Filtrar por PSI status:",
+            options=drift_summary['psi_status'].unique(),
+            default=drift_summary['psi_status'].unique()
+        )
+    with col3:
+        ks_filter = st.selectbox(
+            "Filtrar por KS drift:",
+            options=['Todos', 'Con drift', 'Sin drift']
+        )
+
+    # Aplicar filtros con una sola máscara booleana
+    mask = (drift_summary['risk_level'].isin(risk_filter).to_numpy() &
+            drift_summary['psi_status'].isin(psi_filter).to_numpy())
+
+    if ks_filter != 'Todos':
+        mask &= drift_summary['ks_drift'].to_numpy() == (ks_filter == 'Con drift')
+
+    filtered_df = drift_summary[mask]
+
+    # Mostrar tabla
+    st.dataframe(
+        filtered_df.sort_values('drift_score', ascending=False),
+        use_container_width=True,
+        height=400
+    )
+
+    # Botón de descarga
+    st.download_button(
+        label="📥 Descargar datos filtrados (CSV)",
+        data=to_csv_bytes(filtered_df),
+        file_name=f'drift_report_filtered_{timestamp}.csv',
+        mime='text/csv'
+    )
+
+@st.fragment
+def render_recommendations(drift_summary, threshold_critical, threshold_high, threshold_moderate):
+    """Sección 5: Recomendaciones según el drift máximo"""
+    st.header("💡 Recomendaciones")
+
+    max_drift_score = drift_summary['drift_score'].max()
+
+    if max_drift_score >= threshold_critical:
+        st.error("""
+        ### 🔴 ACCIÓN CRÍTICA REQUERIDA
+
+        **Se ha detectado drift crítico que compromete la precisión del modelo.**
+
+        **Acciones recomendadas:**
+        1. ⚠️ Pausar predicciones en producción si es posible
+        2. 🔄 Reentrenar el modelo INMEDIATAMENTE con datos actuales
+        3. 📊 Realizar análisis profundo de los features con mayor drift
+        4. ✅ Validar el nuevo modelo antes de deployment
+        5. 📝 Documentar las causas del drift detectado
+        """)
+    elif max_drift_score >= threshold_high:
+        st.warning("""
+        ### 🟠 ALERTA: Drift Significativo Detectado
+
+        **Se recomienda planificar reentrenamiento en corto plazo.**
+
+        **Acciones recomendadas:**
+        1. 📅 Programar reentrenamiento del modelo en los próximos 7 días
+        2. 📈 Monitorear métricas de performance del modelo diariamente
+        3. 🔍 Investigar causas del drift en los features más afectados
+        4. 📊 Preparar dataset actualizado para reentrenamiento
+        5. 🔔 Configurar alertas automáticas
+        """)
+    elif max_drift_score >= threshold_moderate:
+        st.info("""
+        ### 🟡 ADVERTENCIA: Drift Moderado
+
+        **Monitorear de cerca la evolución del drift.**
+
+        **Acciones recomendadas:**
+        1. 📊 Continuar monitoreo diario de drift
+        2. 📈 Evaluar tendencias de drift a lo largo del tiempo
+        3. 🔍 Analizar si el drift es temporal o persistente
+        4. 📝 Documentar patrones observados
+        5. ⏰ Considerar reentrenamiento si el drift persiste por 2+ semanas
+        """)
+    else:
+        st.success("""
+        ### 🟢 Estado Normal: Sin Drift Significativo
+
+        **El modelo está operando dentro de parámetros normales.**
+
+        **Acciones recomendadas:**
+        1. ✅ Continuar monitoreo regular semanal
+        2. 📊 Mantener registro histórico de métricas
+        3. 🔄 Planificar reentrenamiento periódico preventivo (cada 3 meses)
+        4. 📈 Monitorear métricas de negocio relacionadas
+        5. 📝 Mantener documentación actualizada
+        """)
+
 # Título principal
 st.title("📊 Data Drift Monitoring Dashboard")
 st.markdown("---")
@@ -41,8 +439,7 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 MONITORING_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), 'monitoring_reports')
 
 if os.path.exists(MONITORING_DIR):
-    drift_files = sorted(glob.glob(os.path.join(MONITORING_DIR, 'drift_summary_*.csv')), reverse=True)
-    alert_files = sorted(glob.glob(os.path.join(MONITORING_DIR, 'alerts_*.json')), reverse=True)
+    drift_files, alert_files = list_monitoring_files(MONITORING_DIR)
     
     if len(drift_files) > 0:
         # Selector de archivo
@@ -53,18 +450,20 @@ if os.path.exists(MONITORING_DIR):
         )
         
         # Cargar datos
-        drift_summary = pd.read_csv(selected_file)
+        drift_summary = load_drift_summary(selected_file, os.path.getmtime(selected_file))
         
         # Cargar alertas correspondientes
         timestamp = os.path.basename(selected_file).replace('drift_summary_', '').replace('.csv', '')
         alert_file = os.path.join(MONITORING_DIR, f'alerts_{timestamp}.json')
         
         if os.path.exists(alert_file):
-            with open(alert_file, 'r') as f:
-                alerts_data = json.load(f)
+            alerts_data = load_alerts(alert_file, os.path.getmtime(alert_file))
         else:
             alerts_data = None
         
+        # Agregaciones independientes de los umbrales (cacheadas)
+        summary = summarize_drift(drift_summary)
+        
         # Mostrar fecha del reporte
         st.sidebar.info(f"📅 Reporte: {timestamp}")
         
@@ -76,300 +475,34 @@ if os.path.exists(MONITORING_DIR):
         
         # Métricas principales en el sidebar
         st.sidebar.markdown("### 📈 Métricas Generales")
-        st.sidebar.metric("Total Features", len(drift_summary))
+        st.sidebar.metric("Total Features", summary.total_features)
         st.sidebar.metric("Features con Drift", 
-                         len(drift_summary[drift_summary['drift_score'] >= threshold_moderate]))
+                         int(np.count_nonzero(summary.drift_scores >= threshold_moderate)))
         st.sidebar.metric("Drift Score Promedio", 
-                         f"{drift_summary['drift_score'].mean():.2f}")
+                         f"{summary.avg_drift_score:.2f}")
         
         # Sección 1: Resumen Ejecutivo
-        st.header("🎯 Resumen Ejecutivo")
-        
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            total_features = len(drift_summary)
-            st.metric("Total Features", total_features)
-        
-        with col2:
-            critical_count = len(drift_summary[drift_summary['drift_score'] >= threshold_critical])
-            st.metric("Features Críticos", critical_count, 
-                     delta=None if critical_count == 0 else "⚠️",
-                     delta_color="inverse")
-        
-        with col3:
-            avg_psi = drift_summary['psi'].mean()
-            st.metric("PSI Promedio", f"{avg_psi:.4f}")
-        
-        with col4:
-            avg_js = drift_summary['js_divergence'].mean()
-            st.metric("JS Div Promedio", f"{avg_js:.4f}")
-        
-        # Mostrar alertas si existen
-        if alerts_data:
-            st.markdown("### 🚨 Alertas Activas")
-            for alert in alerts_data.get('alerts', []):
-                if alert['level'] == '🔴 CRÍTICO':
-                    st.error(f"**{alert['level']}**: {alert['message']}\n\n"
-                            f"**Recomendación**: {alert['recommendation']}")
-                elif alert['level'] == '🟠 ALTO':
-                    st.warning(f"**{alert['level']}**: {alert['message']}\n\n"
-                              f"**Recomendación**: {alert['recommendation']}")
-                elif alert['level'] == '🟡 MODERADO':
-                    st.info(f"**{alert['level']}**: {alert['message']}\n\n"
-                           f"**Recomendación**: {alert['recommendation']}")
-                else:
-                    st.success(f"**{alert['level']}**: {alert['message']}\n\n"
-                              f"**Recomendación**: {alert['recommendation']}")
+        render_executive_summary(summary, alerts_data, threshold_critical)
         
         st.markdown("---")
         
         # Sección 2: Distribución de Riesgo
-        st.header("📊 Distribución de Riesgo")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Pie chart de distribución de riesgo
-            risk_counts = drift_summary['risk_level'].value_counts()
-            fig_pie = go.Figure(data=[go.Pie(
-                labels=risk_counts.index,
-                values=risk_counts.values,
-                hole=0.3,
-                marker=dict(colors=['green', 'yellow', 'orange', 'red'])
-            )])
-            fig_pie.update_layout(title="Distribución de Features por Nivel de Riesgo")
-            st.plotly_chart(fig_pie, use_container_width=True)
-        
-        with col2:
-            # Bar chart de top 10 features
-            top_10 = drift_summary.nlargest(10, 'drift_score')
-            fig_bar = go.Figure(data=[go.Bar(
-                x=top_10['feature'],
-                y=top_10['drift_score'],
-                marker=dict(
-                    color=top_10['drift_score'],
-                    colorscale='Reds',
-                    showscale=True,
-                    colorbar=dict(title="Drift Score")
-                )
-            )])
-            fig_bar.update_layout(
-                title="Top 10 Features con Mayor Drift",
-                xaxis_title="Feature",
-                yaxis_title="Drift Score",
-                xaxis_tickangle=-45
-            )
-            st.plotly_chart(fig_bar, use_container_width=True)
+        render_risk_distribution(summary)
         
         st.markdown("---")
         
         # Sección 3: Análisis Detallado por Métrica
-        st.header("🔍 Análisis Detallado por Métrica")
-        
-        tab1, tab2, tab3 = st.tabs(["📈 PSI", "📉 Jensen-Shannon", "📊 KS Test"])
-        
-        with tab1:
-            col1, col2 = st.columns(2)
-            with col1:
-                # Histograma de PSI
-                fig_psi_hist = px.histogram(
-                    drift_summary, 
-                    x='psi', 
-                    nbins=30,
-                    title="Distribución de PSI",
-                    labels={'psi': 'Population Stability Index'}
-                )
-                fig_psi_hist.add_vline(x=0.1, line_dash="dash", line_color="yellow", 
-                                      annotation_text="Umbral Moderado")
-                fig_psi_hist.add_vline(x=0.2, line_dash="dash", line_color="red", 
-                                      annotation_text="Umbral Crítico")
-                st.plotly_chart(fig_psi_hist, use_container_width=True)
-            
-            with col2:
-                # Top features por PSI
-                top_psi = drift_summary.nlargest(10, 'psi')
-                fig_psi_bar = px.bar(
-                    top_psi,
-                    x='feature',
-                    y='psi',
-                    title="Top 10 Features por PSI",
-                    color='psi',
-                    color_continuous_scale='Reds'
-                )
-                fig_psi_bar.update_layout(xaxis_tickangle=-45)
-                st.plotly_chart(fig_psi_bar, use_container_width=True)
-        
-        with tab2:
-            col1, col2 = st.columns(2)
-            with col1:
-                # Histograma de JS Divergence
-                fig_js_hist = px.histogram(
-                    drift_summary, 
-                    x='js_divergence', 
-                    nbins=30,
-                    title="Distribución de Jensen-Shannon Divergence",
-                    labels={'js_divergence': 'JS Divergence'}
-                )
-                fig_js_hist.add_vline(x=0.1, line_dash="dash", line_color="yellow", 
-                                     annotation_text="Umbral Moderado")
-                fig_js_hist.add_vline(x=0.3, line_dash="dash", line_color="red", 
-                                     annotation_text="Umbral Crítico")
-                st.plotly_chart(fig_js_hist, use_container_width=True)
-            
-            with col2:
-                # Top features por JS
-                top_js = drift_summary.nlargest(10, 'js_divergence')
-                fig_js_bar = px.bar(
-                    top_js,
-                    x='feature',
-                    y='js_divergence',
-                    title="Top 10 Features por JS Divergence",
-                    color='js_divergence',
-                    color_continuous_scale='Reds'
-                )
-                fig_js_bar.update_layout(xaxis_tickangle=-45)
-                st.plotly_chart(fig_js_bar, use_container_width=True)
-        
-        with tab3:
-            col1, col2 = st.columns(2)
-            with col1:
-                # KS Test - Features con drift detectado
-                ks_drift_count = drift_summary['ks_drift'].sum()
-                fig_ks_pie = go.Figure(data=[go.Pie(
-                    labels=['Drift Detectado', 'Sin Drift'],
-                    values=[ks_drift_count, len(drift_summary) - ks_drift_count],
-                    hole=0.3,
-                    marker=dict(colors=['red', 'green'])
-                )])
-                fig_ks_pie.update_layout(title="KS Test - Detección de Drift")
-                st.plotly_chart(fig_ks_pie, use_container_width=True)
-            
-            with col2:
-                # Top features por KS statistic
-                top_ks = drift_summary.nlargest(10, 'ks_statistic')
-                fig_ks_bar = px.bar(
-                    top_ks,
-                    x='feature',
-                    y='ks_statistic',
-                    title="Top 10 Features por KS Statistic",
-                    color='ks_drift',
-                    color_discrete_map={True: 'red', False: 'green'}
-                )
-                fig_ks_bar.update_layout(xaxis_tickangle=-45)
-                st.plotly_chart(fig_ks_bar, use_container_width=True)
+        render_metric_details(drift_summary, summary)
         
         st.markdown("---")
         
         # Sección 4: Tabla Detallada
-        st.header("📋 Tabla Detallada de Drift por Feature")
-        
-        # Filtros
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            risk_filter = st.multiselect(
-                "Filtrar por nivel de riesgo:",
-                options=drift_summary['risk_level'].unique(),
-                default=drift_summary['risk_level'].unique()
-            )
-        with col2:
-            psi_filter = st.multiselect(
-                "Filtrar por PSI status:",
-                options=drift_summary['psi_status'].unique(),
-                default=drift_summary['psi_status'].unique()
-            )
-        with col3:
-            ks_filter = st.selectbox(
-                "Filtrar por KS drift:",
-                options=['Todos', 'Con drift', 'Sin drift']
-            )
-        
-        # Aplicar filtros
-        filtered_df = drift_summary[
-            (drift_summary['risk_level'].isin(risk_filter)) &
-            (drift_summary['psi_status'].isin(psi_filter))
-        ]
-        
-        if ks_filter == 'Con drift':
-            filtered_df = filtered_df[filtered_df['ks_drift'] == True]
-        elif ks_filter == 'Sin drift':
-            filtered_df = filtered_df[filtered_df['ks_drift'] == False]
-        
-        # Mostrar tabla
-        st.dataframe(
-            filtered_df.sort_values('drift_score', ascending=False),
-            use_container_width=True,
-            height=400
-        )
-        
-        # Botón de descarga
-        csv = filtered_df.to_csv(index=False)
-        st.download_button(
-            label="📥 Descargar datos filtrados (CSV)",
-            data=csv,
-            file_name=f'drift_report_filtered_{timestamp}.csv',
-            mime='text/csv'
-        )
+        render_detail_table(drift_summary, timestamp)
         
         st.markdown("---")
         
         # Sección 5: Recomendaciones
-        st.header("💡 Recomendaciones")
-        
-        max_drift_score = drift_summary['drift_score'].max()
-        
-        if max_drift_score >= threshold_critical:
-            st.error("""
-            ### 🔴 ACCIÓN CRÍTICA REQUERIDA
-            
-            **Se ha detectado drift crítico que compromete la precisión del modelo.**
-            
-            **Acciones recomendadas:**
-            1. ⚠️ Pausar predicciones en producción si es posible
-            2. 🔄 Reentrenar el modelo INMEDIATAMENTE con datos actuales
-            3. 📊 Realizar análisis profundo de los features con mayor drift
-            4. ✅ Validar el nuevo modelo antes de deployment
-            5. 📝 Documentar las causas del drift detectado
-            """)
-        elif max_drift_score >= threshold_high:
-            st.warning("""
-            ### 🟠 ALERTA: Drift Significativo Detectado
-            
-            **Se recomienda planificar reentrenamiento en corto plazo.**
-            
-            **Acciones recomendadas:**
-            1. 📅 Programar reentrenamiento del modelo en los próximos 7 días
-            2. 📈 Monitorear métricas de performance del modelo diariamente
-            3. 🔍 Investigar causas del drift en los features más afectados
-            4. 📊 Preparar dataset actualizado para reentrenamiento
-            5. 🔔 Configurar alertas automáticas
-            """)
-        elif max_drift_score >= threshold_moderate:
-            st.info("""
-            ### 🟡 ADVERTENCIA: Drift Moderado
-            
-            **Monitorear de cerca la evolución del drift.**
-            
-            **Acciones recomendadas:**
-            1. 📊 Continuar monitoreo diario de drift
-            2. 📈 Evaluar tendencias de drift a lo largo del tiempo
-            3. 🔍 Analizar si el drift es temporal o persistente
-            4. 📝 Documentar patrones observados
-            5. ⏰ Considerar reentrenamiento si el drift persiste por 2+ semanas
-            """)
-        else:
-            st.success("""
-            ### 🟢 Estado Normal: Sin Drift Significativo
-            
-            **El modelo está operando dentro de parámetros normales.**
-            
-            **Acciones recomendadas:**
-            1. ✅ Continuar monitoreo regular semanal
-            2. 📊 Mantener registro histórico de métricas
-            3. 🔄 Planificar reentrenamiento periódico preventivo (cada 3 meses)
-            4. 📈 Monitorear métricas de negocio relacionadas
-            5. 📝 Mantener documentación actualizada
-            """)
+        render_recommendations(drift_summary, threshold_critical, threshold_high, threshold_moderate)
         
     else:
         st.warning("⚠️ No se encontraron reportes de monitoreo. Ejecuta `model_monitoring.ipynb` primero.")
@@ -0,0 +1,248 @@
+"""
+Utilidades Compartidas de las Interfaces de Predicción
+======================================================
+
+Conexión con la API, caché de predicciones y visualización del resultado
+pendiente, comunes a streamlit_predict.py y prediction_interface.py.
+Cada interfaz conserva su propio diseño (formulario y resultado) y
+delega aquí todo lo que habla con la API.
+
+Autor: MLOps Pipeline Project
+Fecha: Noviembre 2025
+"""
+
+import socket
+from concurrent.futures import wait
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from api_client import AsyncAPIClient
+
+
+# ============================================================================
+# Configuración
+# ============================================================================
+
+# URL de la API
+API_URL = "http://localhost:8000"
+API_ADDRESS = (urlsplit(API_URL).hostname, urlsplit(API_URL).port or 80)
+
+# Orden de las características en la clave de caché de predicciones
+FEATURE_ORDER = (
+    "longitude", "latitude", "housing_median_age", "total_rooms",
+    "total_bedrooms", "population", "households", "median_income",
+    "ocean_proximity"
+)
+
+# Categorías que acepta la API; se validan antes de enviar la predicción
+OCEAN_PROXIMITY_OPTIONS = ('<1H OCEAN', 'INLAND', 'NEAR OCEAN', 'NEAR BAY', 'ISLAND')
+VALID_OCEAN_PROXIMITY = frozenset(OCEAN_PROXIMITY_OPTIONS)
+
+# Ejemplo de datos de entrada (sidebar de streamlit_predict.py y calentamiento de la API)
+EXAMPLE_DATA = {
+    "longitude": -122.23,
+    "latitude": 37.88,
+    "housing_median_age": 41,
+    "total_rooms": 880,
+    "total_bedrooms": 129,
+    "population": 322,
+    "households": 126,
+    "median_income": 8.3252,
+    "ocean_proximity": "NEAR BAY"
+}
+
+# Espera inicial antes de pasar a sondear la predicción (la mayoría termina antes)
+PREDICTION_WAIT_SECONDS = 0.05
+PREDICTION_POLL_SECONDS = 0.1
+
+# ============================================================================
+# Clientes HTTP (uno por proceso de Streamlit)
+# ============================================================================
+
+@st.cache_resource(show_spinner=False)
+def get_http_session():
+    """
+    Crea la sesión HTTP compartida, con pool de conexiones keep-alive y reintentos.
+
+    cache_resource devuelve el mismo objeto en cada rerun y a todos los
+    usuarios, así que el pool de conexiones sobrevive a los clics del botón.
+    """
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(
+        pool_connections=8,
+        pool_maxsize=32,
+        max_retries=Retry(total=2, backoff_factor=0.1)
+    ))
+    return session
+
+@st.cache_resource
+def get_async_client():
+    """Cliente asíncrono único por proceso (su loop y pool sobreviven a los reruns)"""
+    return AsyncAPIClient(API_URL, timeout=5.0, max_batch_size=32, max_queue_time=0.02)
+
+# ============================================================================
+# Estado de la API
+# ============================================================================
+
+@st.cache_data(ttl=30, show_spinner=False)
+def check_api_health():
+    """Verifica que el puerto de la API acepta conexiones (sondeo TCP, cacheado 30 s)"""
+    try:
+        with socket.create_connection(API_ADDRESS, timeout=0.1):
+            return True
+    except OSError:
+        return False
+
+def verify_api_contract():
+    """Verifica vía /health que el servicio es la API (una vez por sesión)"""
+    if st.session_state.get("api_contract_ok"):
+        return True
+    try:
+        response = get_http_session().get(f"{API_URL}/health", timeout=2)
+    except requests.RequestException:
+        return False
+    st.session_state["api_contract_ok"] = response.status_code == 200
+    return st.session_state["api_contract_ok"]
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_model_version():
+    """
+    Obtiene vía /health la versión de los artefactos cargados en la API.
+
+    Cambia al redesplegar un modelo o preprocessor aunque sea de la misma
+    clase, y forma parte de la clave de caché de las predicciones.
+    """
+    try:
+        response = get_http_session().get(f"{API_URL}/health", timeout=2)
+        return response.json().get("model_version") if response.status_code == 200 else None
+    except (requests.RequestException, ValueError):
+        return None
+
+# ============================================================================
+# Predicciones
+# ============================================================================
+
+@st.cache_resource(show_spinner=False, validate=bool)
+def warm_up_api():
+    """
+    Lanza una predicción de ejemplo una vez por proceso de Streamlit.
+
+    Calienta el modelo en la API y el pool del cliente asíncrono para que
+    la primera predicción de un usuario no pague el arranque en frío. Si
+    falla, validate=bool descarta el resultado y se reintenta en el
+    siguiente rerun con la API disponible.
+    """
+    client = get_async_client()
+    return "error" not in client.run(client.predict(EXAMPLE_DATA))
+
+def prediction_result(future):
+    """Obtiene el resultado de un future terminado como respuesta de la API"""
+    try:
+        return future.result()
+    except Exception as e:
+        return {"error": str(e)}
+
+def _prediction_is_valid(future):
+    """Descarta de la caché las predicciones que terminaron con error"""
+    return not future.done() or "error" not in prediction_result(future)
+
+@st.cache_resource(ttl=24*60*60, max_entries=256, show_spinner=False, validate=_prediction_is_valid)
+def prediction_future(feature_values, model_version):
+    """
+    Lanza sin bloquear la predicción de una tupla de características.
+
+    Se cachea el future: entradas repetidas reutilizan el resultado (o la
+    petición aún en curso) y las que terminaron con error se vuelven a lanzar.
+    model_version solo forma parte de la clave: al redesplegar el modelo o
+    el preprocessor de la API (como mucho 30 s después, por la caché de
+    get_model_version) las predicciones anteriores dejan de reutilizarse.
+    """
+    client = get_async_client()
+    return client.submit(client.predict_batched(dict(zip(FEATURE_ORDER, feature_values))))
+
+def submit_prediction(features):
+    """Envía una predicción a la API sin bloquear el script"""
+    return prediction_future(
+        tuple(features[name] for name in FEATURE_ORDER), get_model_version()
+    )
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def compute_derived_metrics(total_rooms, total_bedrooms, population, households,
+                            median_income, prediction):
+    """
+    Calcula las métricas derivadas que se muestran junto a la predicción.
+
+    Los denominadores se acotan a 1 (los widgets ya imponen min_value=1).
+
+    Returns:
+        SimpleNamespace con ratios por hogar/habitación, precios unitarios
+        e ingreso en USD
+    """
+    return SimpleNamespace(
+        rooms_per_household=total_rooms / max(households, 1),
+        bedrooms_per_room=total_bedrooms / max(total_rooms, 1),
+        population_per_household=population / max(households, 1),
+        price_per_room=prediction / max(total_rooms, 1),
+        price_per_household=prediction / max(households, 1),
+        income_usd=median_income * 10000
+    )
+
+# ============================================================================
+# Resultado pendiente
+# ============================================================================
+
+def poll_prediction(message):
+    """Fragmento que se re-ejecuta hasta que la predicción pendiente termina"""
+    pending = st.session_state.get("pending_prediction")
+    if pending is None:
+        return
+    if pending[1].done():
+        # Rerun completo: muestra el resultado y detiene el sondeo
+        st.rerun()
+    st.info(message)
+
+def show_prediction(features, render_prediction, message="Realizando predicción..."):
+    """
+    Muestra la predicción pendiente de la sesión o, si las entradas no
+    cambiaron, la última predicción válida.
+
+    Si la API falla y ya hubo una predicción válida, se muestra esa con un
+    aviso. Si la predicción no termina en PREDICTION_WAIT_SECONDS, un
+    fragmento la sondea sin bloquear el resto de la página.
+
+    Args:
+        features: Características actuales del formulario
+        render_prediction: Función (features, result) que dibuja un resultado
+        message: Texto mostrado mientras la predicción está en curso
+    """
+    if "pending_prediction" in st.session_state:
+        pending_features, future = st.session_state["pending_prediction"]
+
+        with st.spinner(message):
+            wait([future], timeout=PREDICTION_WAIT_SECONDS)
+
+        if future.done():
+            del st.session_state["pending_prediction"]
+            result = prediction_result(future)
+
+            if "error" not in result:
+                st.session_state["last_prediction"] = (pending_features, result)
+            elif "last_prediction" in st.session_state:
+                # Respaldo: última predicción válida, con los datos con que se calculó
+                st.warning(
+                    f"⚠️ La API no respondió ({result['error']}). "
+                    "Se muestra la última predicción válida."
+                )
+                pending_features, result = st.session_state["last_prediction"]
+
+            render_prediction(pending_features, result)
+        else:
+            st.fragment(poll_prediction, run_every=PREDICTION_POLL_SECONDS)(message)
+    elif st.session_state.get("last_prediction", (None, None))[0] == features:
+        # Entradas sin cambios: se vuelve a mostrar el último resultado sin llamar a la API
+        render_prediction(*st.session_state["last_prediction"])
@@ -10,9 +10,21 @@ Fecha: Noviembre 2025
 """
 
 import streamlit as st
-import requests
 import pandas as pd
 import json
+import os
+import sys
+import time
+from bisect import bisect_right
+
+# Agregar src/ al path para las utilidades compartidas con prediction_interface.py
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from streamlit_common import (
+    EXAMPLE_DATA, OCEAN_PROXIMITY_OPTIONS, VALID_OCEAN_PROXIMITY,
+    check_api_health, compute_derived_metrics, show_prediction,
+    submit_prediction, verify_api_contract, warm_up_api
+)
 
 # Configuración de la página
 st.set_page_config(
@@ -22,37 +34,14 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# URL de la API
-API_URL = "http://localhost:8000"
-
 # ============================================================================
 # Funciones auxiliares
 # ============================================================================
 
-def check_api_health():
-    """Verificar si la API está disponible"""
-    try:
-        response = requests.get(f"{API_URL}/health", timeout=2)
-        return response.status_code == 200
-    except:
-        return False
-
-def make_prediction(features):
-    """Hacer una predicción usando la API"""
-    try:
-        response = requests.post(
-            f"{API_URL}/predict",
-            json=features,
-            headers={"Content-Type": "application/json"},
-            timeout=5
-        )
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            return {"error": f"Error {response.status_code}: {response.text}"}
-    except Exception as e:
-        return {"error": str(e)}
+@st.cache_data(show_spinner=False)
+def example_json():
+    """Serializar EXAMPLE_DATA una sola vez para el sidebar"""
+    return json.dumps(EXAMPLE_DATA, indent=2)
 
 # ============================================================================
 # Interfaz principal
@@ -62,8 +51,17 @@ st.title("🏠 Predicción de Precios de Viviendas")
 st.markdown("### California Housing Dataset - Predictor en Tiempo Real")
 
 # Verificar estado de la API
-if check_api_health():
+if check_api_health() and verify_api_contract():
+    st.session_state["last_api_ok"] = time.time()
+    warm_up_api()
     st.success("✅ API conectada y funcionando")
+elif "last_api_ok" in st.session_state:
+    # La API ya respondió en esta sesión: se mantiene la interfaz con un aviso
+    elapsed = time.time() - st.session_state["last_api_ok"]
+    st.warning(
+        f"⚠️ La API no responde (último contacto correcto hace {elapsed:.0f} s). "
+        "Se muestran los últimos datos conocidos."
+    )
 else:
     st.error("❌ API no disponible. Asegúrate de que el servidor esté corriendo en puerto 8000")
     st.info("Ejecuta: `uvicorn model_deploy:app --host 0.0.0.0 --port 8000 --reload`")
@@ -77,118 +75,140 @@ st.markdown("---")
 
 st.header("📝 Ingresa los datos de la vivienda")
 
-col1, col2, col3 = st.columns(3)
+# Formulario: los cambios en los campos solo provocan un rerun al enviarlo
+with st.form("housing_form"):
+    col1, col2, col3 = st.columns(3)
 
-with col1:
-    st.subheader("📍 Ubicación")
-    longitude = st.number_input(
-        "Longitud",
-        min_value=-125.0,
-        max_value=-114.0,
-        value=-122.23,
-        step=0.01,
-        help="Coordenada de longitud geográfica"
-    )
+    with col1:
+        st.subheader("📍 Ubicación")
+        longitude = st.number_input(
+            "Longitud",
+            min_value=-125.0,
+            max_value=-114.0,
+            value=-122.23,
+            step=0.01,
+            help="Coordenada de longitud geográfica"
+        )
     
-    latitude = st.number_input(
-        "Latitud",
-        min_value=32.0,
-        max_value=42.0,
-        value=37.88,
-        step=0.01,
-        help="Coordenada de latitud geográfica"
-    )
+        latitude = st.number_input(
+            "Latitud",
+            min_value=32.0,
+            max_value=42.0,
+            value=37.88,
+            step=0.01,
+            help="Coordenada de latitud geográfica"
+        )
     
-    ocean_proximity = st.selectbox(
-        "Proximidad al océano",
-        options=['<1H OCEAN', 'INLAND', 'NEAR OCEAN', 'NEAR BAY', 'ISLAND'],
-        index=3,
-        help="Cercanía de la vivienda al océano"
-    )
+        ocean_proximity = st.selectbox(
+            "Proximidad al océano",
+            options=OCEAN_PROXIMITY_OPTIONS,
+            index=3,
+            help="Cercanía de la vivienda al océano"
+        )
 
-with col2:
-    st.subheader("🏘️ Características de la Vivienda")
-    housing_median_age = st.slider(
-        "Edad mediana de las viviendas (años)",
-        min_value=1,
-        max_value=100,
-        value=41,
-        help="Edad promedio de las viviendas en el bloque"
-    )
+    with col2:
+        st.subheader("🏘️ Características de la Vivienda")
+        housing_median_age = st.slider(
+            "Edad mediana de las viviendas (años)",
+            min_value=1,
+            max_value=100,
+            value=41,
+            help="Edad promedio de las viviendas en el bloque"
+        )
     
-    total_rooms = st.number_input(
-        "Total de habitaciones",
-        min_value=1,
-        value=880,
-        step=10,
-        help="Número total de habitaciones en el bloque"
-    )
+        total_rooms = st.number_input(
+            "Total de habitaciones",
+            min_value=1,
+            value=880,
+            step=10,
+            help="Número total de habitaciones en el bloque"
+        )
     
-    total_bedrooms = st.number_input(
-        "Total de dormitorios",
-        min_value=1,
-        value=129,
-        step=5,
-        help="Número total de dormitorios en el bloque"
-    )
+        total_bedrooms = st.number_input(
+            "Total de dormitorios",
+            min_value=1,
+            value=129,
+            step=5,
+            help="Número total de dormitorios en el bloque"
+        )
 
-with col3:
-    st.subheader("👥 Población y Economía")
-    population = st.number_input(
-        "Población",
-        min_value=1,
-        value=322,
-        step=10,
-        help="Población total del bloque"
-    )
+    with col3:
+        st.subheader("👥 Población y Economía")
+        population = st.number_input(
+            "Población",
+            min_value=1,
+            value=322,
+            step=10,
+            help="Población total del bloque"
+        )
     
-    households = st.number_input(
-        "Número de hogares",
-        min_value=1,
-        value=126,
-        step=5,
-        help="Número de hogares en el bloque"
-    )
+        households = st.number_input(
+            "Número de hogares",
+            min_value=1,
+            value=126,
+            step=5,
+            help="Número de hogares en el bloque"
+        )
     
-    median_income = st.number_input(
-        "Ingreso mediano ($10,000)",
-        min_value=0.0,
-        max_value=15.0,
-        value=8.3252,
-        step=0.1,
-        help="Ingreso mediano en unidades de $10,000"
-    )
+        median_income = st.number_input(
+            "Ingreso mediano ($10,000)",
+            min_value=0.0,
+            max_value=15.0,
+            value=8.3252,
+            step=0.1,
+            help="Ingreso mediano en unidades de $10,000"
+        )
+
+    
+    col1, col2, col3 = st.columns([1, 1, 1])
+    
+    with col2:
+        predict_button = st.form_submit_button("🔮 Predecir Precio", type="primary", use_container_width=True)
 
 st.markdown("---")
 
 # ============================================================================
-# Botón de predicción
+# Predicción
 # ============================================================================
 
-col1, col2, col3 = st.columns([1, 1, 1])
-
-with col2:
-    predict_button = st.button("🔮 Predecir Precio", type="primary", use_container_width=True)
+# Preparar datos para la API (en cada rerun, para compararlos con la última predicción)
+features = {
+    "longitude": longitude,
+    "latitude": latitude,
+    "housing_median_age": housing_median_age,
+    "total_rooms": total_rooms,
+    "total_bedrooms": total_bedrooms,
+    "population": population,
+    "households": households,
+    "median_income": median_income,
+    "ocean_proximity": ocean_proximity
+}
 
 if predict_button:
-    # Preparar datos para la API
-    features = {
-        "longitude": float(longitude),
-        "latitude": float(latitude),
-        "housing_median_age": float(housing_median_age),
-        "total_rooms": float(total_rooms),
-        "total_bedrooms": float(total_bedrooms),
-        "population": float(population),
-        "households": float(households),
-        "median_income": float(median_income),
-        "ocean_proximity": ocean_proximity
-    }
-    
-    # Hacer predicción
-    with st.spinner("🤖 Realizando predicción..."):
-        result = make_prediction(features)
+    # Una categoría inválida se rechaza aquí, sin ida y vuelta a la API
+    if features["ocean_proximity"] not in VALID_OCEAN_PROXIMITY:
+        st.error(f"❌ Categoría de proximidad al océano inválida: {features['ocean_proximity']}")
+        st.stop()
     
-    # Mostrar resultados
+    # Enviar la predicción sin bloquear el script
+    st.session_state["pending_prediction"] = (features, submit_prediction(features))
+
+# ============================================================================
+# Resultado de la predicción
+# ============================================================================
+
+# Rangos de referencia del precio: PRICE_BUCKETS[i] corresponde a precios
+# por debajo de PRICE_LIMITS[i] (el último, a los que superan todos los límites)
+PRICE_LIMITS = (150_000, 300_000, 450_000)
+PRICE_BUCKETS = (
+    (st.info, "🟢 Precio bajo - Vivienda económica"),
+    (st.info, "🟡 Precio medio - Vivienda accesible"),
+    (st.warning, "🟠 Precio alto - Vivienda premium"),
+    (st.error, "🔴 Precio muy alto - Vivienda de lujo")
+)
+
+def render_prediction(features, result):
+    """Mostrar el resultado de una predicción"""
     if "error" in result:
         st.error(f"❌ Error: {result['error']}")
     else:
@@ -199,23 +219,15 @@ if predict_button:
         st.markdown("## 💰 Precio Predicho")
         
         predicted_price = result['prediction']
+        derived = compute_derived_metrics(
+            features["total_rooms"], features["total_bedrooms"], features["population"],
+            features["households"], features["median_income"], predicted_price
+        )
         
         # Mostrar precio en formato grande
         col1, col2, col3 = st.columns([1, 2, 1])
         with col2:
-            st.markdown(
-                f"""
-                <div style='text-align: center; padding: 30px; background-color: #f0f2f6; border-radius: 10px;'>
-                    <h1 style='color: #1f77b4; font-size: 60px; margin: 0;'>
-                        ${predicted_price:,.2f}
-                    </h1>
-                    <p style='color: #666; font-size: 18px; margin-top: 10px;'>
-                        Precio estimado de la vivienda
-                    </p>
-                </div>
-                """,
-                unsafe_allow_html=True
-            )
+            st.metric(label="💰 Precio estimado de la vivienda", value=f"${predicted_price:,.2f}")
         
         # Información adicional
         st.markdown("---")
@@ -226,35 +238,25 @@ if predict_button:
             st.write(f"**Modelo utilizado:** {result.get('model_name', 'N/A')}")
             st.write(f"**Timestamp:** {result.get('timestamp', 'N/A')}")
             
-            # Calcular métricas derivadas
-            rooms_per_household = total_rooms / households
-            bedrooms_per_room = total_bedrooms / total_rooms
-            population_per_household = population / households
-            
-            st.write(f"**Habitaciones por hogar:** {rooms_per_household:.2f}")
-            st.write(f"**Proporción dormitorios:** {bedrooms_per_room:.2f}")
-            st.write(f"**Personas por hogar:** {population_per_household:.2f}")
+            # Métricas derivadas
+            st.write(f"**Habitaciones por hogar:** {derived.rooms_per_household:.2f}")
+            st.write(f"**Proporción dormitorios:** {derived.bedrooms_per_room:.2f}")
+            st.write(f"**Personas por hogar:** {derived.population_per_household:.2f}")
         
         with col2:
             st.markdown("### 💵 Análisis del Precio")
             
             # Rangos de referencia
-            if predicted_price < 150000:
-                st.info("🟢 Precio bajo - Vivienda económica")
-            elif predicted_price < 300000:
-                st.info("🟡 Precio medio - Vivienda accesible")
-            elif predicted_price < 450000:
-                st.warning("🟠 Precio alto - Vivienda premium")
-            else:
-                st.error("🔴 Precio muy alto - Vivienda de lujo")
+            show, message = PRICE_BUCKETS[bisect_right(PRICE_LIMITS, predicted_price)]
+            show(message)
             
             # Precio por habitación
-            price_per_room = predicted_price / total_rooms
-            st.write(f"**Precio por habitación:** ${price_per_room:,.2f}")
+            st.write(f"**Precio por habitación:** ${derived.price_per_room:,.2f}")
             
             # Precio por hogar
-            price_per_household = predicted_price / households
-            st.write(f"**Precio por hogar:** ${price_per_household:,.2f}")
+            st.write(f"**Precio por hogar:** ${derived.price_per_household:,.2f}")
+
+show_prediction(features, render_prediction, message="🤖 Realizando predicción...")
 
 # ============================================================================
 # Sidebar con información
@@ -292,29 +294,11 @@ with st.sidebar:
     
     # Mostrar ejemplo de datos
     with st.expander("📋 Ver ejemplo de datos"):
-        example_data = {
-            "longitude": -122.23,
-            "latitude": 37.88,
-            "housing_median_age": 41,
-            "total_rooms": 880,
-            "total_bedrooms": 129,
-            "population": 322,
-            "households": 126,
-            "median_income": 8.3252,
-            "ocean_proximity": "NEAR BAY"
-        }
-        st.json(example_data)
+        st.code(example_json(), language="json")
 
 # ============================================================================
 # Footer
 # ============================================================================
 
 st.markdown("---")
-st.markdown(
-    """
-    <div style='text-align: center; color: #666; padding: 20px;'>
-        <p>🏠 California Housing Price Prediction | MLOps Pipeline Project 2025</p>
-    </div>
-    """,
-    unsafe_allow_html=True
-)
+st.caption("🏠 California Housing Price Prediction | MLOps Pipeline Project 2025")
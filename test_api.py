@@ -8,13 +8,27 @@ Incluye tests para predicción individual, batch, y health checks.
 Autor: MLOps Pipeline Project
 Fecha: Noviembre 2025
 
+Los tests son independientes entre sí y se lanzan de forma concurrente
+con un único httpx.AsyncClient, reutilizando sus conexiones keep-alive.
+
 Uso:
     python test_api.py
+    python test_api.py --ci    # Sin confirmación ni banner (integración continua)
+    python test_api.py --min-speedup 5    # Falla si el batch no es 5x más rápido
 """
 
-import requests
-import json
-from datetime import datetime
+import argparse
+import asyncio
+import math
+import orjson
+import sys
+import time
+from functools import partial
+
+try:
+    import ijson
+except ImportError:  # Opcional: sin ijson la respuesta batch se parsea completa
+    ijson = None
 
 # Configuración
 API_BASE_URL = "http://localhost:8000"
@@ -27,82 +41,146 @@ class Colors:
     BLUE = '\033[94m'
     END = '\033[0m'
 
-def print_header(text):
-    """Imprimir encabezado"""
-    print(f"\n{Colors.BLUE}{'='*80}{Colors.END}")
-    print(f"{Colors.BLUE}{text.center(80)}{Colors.END}")
-    print(f"{Colors.BLUE}{'='*80}{Colors.END}\n")
+# Sin terminal (logs redirigidos, CI) la salida va sin secuencias de escape
+if not sys.stdout.isatty():
+    Colors.GREEN = Colors.RED = Colors.YELLOW = Colors.BLUE = Colors.END = ''
 
-def print_success(text):
-    """Imprimir éxito"""
-    print(f"{Colors.GREEN}✓ {text}{Colors.END}")
+# Prefijos y sufijos ya codificados en UTF-8 para el Reporter
+_SUCCESS = f"{Colors.GREEN}✓ ".encode("utf-8")
+_ERROR = f"{Colors.RED}✗ ".encode("utf-8")
+_INFO = f"{Colors.YELLOW}ℹ ".encode("utf-8")
+_BLUE = Colors.BLUE.encode("utf-8")
+_END = Colors.END.encode("utf-8")
+_RULE = _BLUE + b"=" * 80 + _END
 
-def print_error(text):
-    """Imprimir error"""
-    print(f"{Colors.RED}✗ {text}{Colors.END}")
+class Reporter:
+    """
+    Acumula la salida de un test y la escribe de una sola vez.
+    
+    Cada línea se guarda ya codificada en un buffer y flush() emite todo
+    el bloque con un único write sobre sys.stdout.buffer, en lugar de una
+    llamada a print por línea.
+    """
+    
+    def __init__(self):
+        self.buf = []
+    
+    def header(self, text):
+        """Añadir encabezado"""
+        self.buf.append(b"\n" + _RULE)
+        self.buf.append(_BLUE + text.center(80).encode("utf-8") + _END)
+        self.buf.append(_RULE + b"\n")
+    
+    def success(self, text):
+        """Añadir éxito"""
+        self.buf.append(_SUCCESS + text.encode("utf-8") + _END)
+    
+    def error(self, text):
+        """Añadir error"""
+        self.buf.append(_ERROR + text.encode("utf-8") + _END)
+    
+    def info(self, text):
+        """Añadir información"""
+        self.buf.append(_INFO + text.encode("utf-8") + _END)
+    
+    def line(self, text=""):
+        """Añadir una línea sin formato"""
+        self.buf.append(text.encode("utf-8"))
+    
+    def flush(self):
+        """Escribir el bloque acumulado en stdout y vaciar el buffer"""
+        if self.buf:
+            sys.stdout.flush()  # Respetar el orden con lo escrito vía print()
+            sys.stdout.buffer.write(b"\n".join(self.buf) + b"\n")
+            sys.stdout.buffer.flush()
+            self.buf.clear()
+
+class AsyncResponseReader:
+    """Adapta el stream de bytes de una respuesta httpx a la interfaz read() de ijson"""
+    
+    def __init__(self, response):
+        self._chunks = response.aiter_bytes()
+    
+    async def read(self, size=-1):
+        """Devolver el siguiente fragmento recibido (b"" al terminar)"""
+        if size == 0:  # ijson llama a read(0) para detectar si el stream es de bytes
+            return b""
+        return await anext(self._chunks, b"")
+
+async def read_batch_response(response):
+    """
+    Leer la respuesta de /predict/batch a medida que llega.
+    
+    Con ijson las predicciones se parsean mientras se reciben, sin cargar
+    el cuerpo completo en memoria; sin ijson se lee y parsea de una vez.
+    
+    Args:
+        response: Respuesta httpx abierta en modo stream
+    
+    Returns:
+        Diccionario con predictions, model_name, timestamp y count
+    """
+    if ijson is None:
+        await response.aread()
+        return orjson.loads(response.content)
+    
+    data = {"predictions": []}
+    async for prefix, event, value in ijson.parse_async(AsyncResponseReader(response), use_float=True):
+        if prefix == "predictions.item":
+            data["predictions"].append(value)
+        elif prefix in ("model_name", "timestamp", "count"):
+            data[prefix] = value
+    return data
 
-def print_info(text):
-    """Imprimir información"""
-    print(f"{Colors.YELLOW}ℹ {text}{Colors.END}")
+# Las comprobaciones se llaman check_* para que pytest no las recoja como tests:
+# este script se ejecuta directamente contra una API en marcha (ver run_tests)
 
-def test_root_endpoint():
+async def check_root_endpoint(client, out):
     """Test del endpoint raíz"""
-    print_header("TEST 1: Root Endpoint")
+    response = await client.get("/")
     
-    try:
-        response = requests.get(f"{API_BASE_URL}/")
-        
-        if response.status_code == 200:
-            data = response.json()
-            print_success(f"Status Code: {response.status_code}")
-            print_info(f"Service: {data.get('service')}")
-            print_info(f"Version: {data.get('version')}")
-            print_info(f"Status: {data.get('status')}")
-            print(f"\nEndpoints disponibles:")
-            for key, value in data.get('endpoints', {}).items():
-                print(f"  • {key}: {value}")
-            return True
-        else:
-            print_error(f"Status Code: {response.status_code}")
-            return False
-            
-    except Exception as e:
-        print_error(f"Error: {str(e)}")
+    out.header("TEST 1: Root Endpoint")
+    
+    if response.status_code == 200:
+        data = orjson.loads(response.content)
+        out.success(f"Status Code: {response.status_code}")
+        out.info(f"Service: {data.get('service')}")
+        out.info(f"Version: {data.get('version')}")
+        out.info(f"Status: {data.get('status')}")
+        out.line(f"\nEndpoints disponibles:")
+        for key, value in data.get('endpoints', {}).items():
+            out.line(f"  • {key}: {value}")
+        return True
+    else:
+        out.error(f"Status Code: {response.status_code}")
         return False
 
-def test_health_endpoint():
+async def check_health_endpoint(client, out):
     """Test del endpoint de health check"""
-    print_header("TEST 2: Health Check Endpoint")
+    response = await client.get("/health")
     
-    try:
-        response = requests.get(f"{API_BASE_URL}/health")
+    out.header("TEST 2: Health Check Endpoint")
+    
+    if response.status_code == 200:
+        data = orjson.loads(response.content)
+        out.success(f"Status Code: {response.status_code}")
+        out.info(f"Status: {data.get('status')}")
+        out.info(f"Model Loaded: {data.get('model_loaded')}")
+        out.info(f"Model Name: {data.get('model_name', 'N/A')}")
+        out.info(f"Timestamp: {data.get('timestamp')}")
         
-        if response.status_code == 200:
-            data = response.json()
-            print_success(f"Status Code: {response.status_code}")
-            print_info(f"Status: {data.get('status')}")
-            print_info(f"Model Loaded: {data.get('model_loaded')}")
-            print_info(f"Model Name: {data.get('model_name', 'N/A')}")
-            print_info(f"Timestamp: {data.get('timestamp')}")
-            
-            if data.get('model_loaded'):
-                print_success("Modelo cargado correctamente")
-                return True
-            else:
-                print_error("Modelo no está cargado")
-                return False
+        if data.get('model_loaded'):
+            out.success("Modelo cargado correctamente")
+            return True
         else:
-            print_error(f"Status Code: {response.status_code}")
+            out.error("Modelo no está cargado")
             return False
-            
-    except Exception as e:
-        print_error(f"Error: {str(e)}")
+    else:
+        out.error(f"Status Code: {response.status_code}")
         return False
 
-def test_predict_endpoint():
+async def check_predict_endpoint(client, out):
     """Test del endpoint de predicción individual"""
-    print_header("TEST 3: Predict Endpoint (Individual)")
-    
     # Datos de ejemplo
     test_data = {
         "longitude": -122.23,
@@ -116,36 +194,30 @@ def test_predict_endpoint():
         "ocean_proximity": "NEAR BAY"
     }
     
-    print_info("Datos de entrada:")
-    print(json.dumps(test_data, indent=2))
+    response = await client.post(
+        "/predict",
+        content=orjson.dumps(test_data),
+        headers={"Content-Type": "application/json"}
+    )
     
-    try:
-        response = requests.post(
-            f"{API_BASE_URL}/predict",
-            json=test_data,
-            headers={"Content-Type": "application/json"}
-        )
-        
-        if response.status_code == 200:
-            data = response.json()
-            print_success(f"Status Code: {response.status_code}")
-            print_success(f"Predicción: ${data.get('prediction'):,.2f}")
-            print_info(f"Modelo: {data.get('model_name')}")
-            print_info(f"Timestamp: {data.get('timestamp')}")
-            return True
-        else:
-            print_error(f"Status Code: {response.status_code}")
-            print_error(f"Error: {response.text}")
-            return False
-            
-    except Exception as e:
-        print_error(f"Error: {str(e)}")
+    out.header("TEST 3: Predict Endpoint (Individual)")
+    out.info("Datos de entrada:")
+    out.line(orjson.dumps(test_data, option=orjson.OPT_INDENT_2).decode("utf-8"))
+    
+    if response.status_code == 200:
+        data = orjson.loads(response.content)
+        out.success(f"Status Code: {response.status_code}")
+        out.success(f"Predicción: ${data.get('prediction'):,.2f}")
+        out.info(f"Modelo: {data.get('model_name')}")
+        out.info(f"Timestamp: {data.get('timestamp')}")
+        return True
+    else:
+        out.error(f"Status Code: {response.status_code}")
+        out.error(f"Error: {response.text}")
         return False
 
-def test_predict_batch_endpoint():
+async def check_predict_batch_endpoint(client, out):
     """Test del endpoint de predicción por lotes"""
-    print_header("TEST 4: Predict Batch Endpoint")
-    
     # Datos de ejemplo para batch
     test_data = {
         "instances": [
@@ -185,70 +257,72 @@ def test_predict_batch_endpoint():
         ]
     }
     
-    print_info(f"Número de instancias: {len(test_data['instances'])}")
-    
-    try:
-        response = requests.post(
-            f"{API_BASE_URL}/predict/batch",
-            json=test_data,
-            headers={"Content-Type": "application/json"}
-        )
-        
+    async with client.stream(
+        "POST",
+        "/predict/batch",
+        content=orjson.dumps(test_data),
+        headers={"Content-Type": "application/json"}
+    ) as response:
         if response.status_code == 200:
-            data = response.json()
-            print_success(f"Status Code: {response.status_code}")
-            print_success(f"Predicciones realizadas: {data.get('count')}")
-            print_info(f"Modelo: {data.get('model_name')}")
-            print_info(f"Timestamp: {data.get('timestamp')}")
-            
-            print("\nPredicciones:")
-            for i, pred in enumerate(data.get('predictions', []), 1):
-                print(f"  {i}. ${pred:,.2f}")
-            
-            return True
+            data = await read_batch_response(response)
         else:
-            print_error(f"Status Code: {response.status_code}")
-            print_error(f"Error: {response.text}")
-            return False
-            
-    except Exception as e:
-        print_error(f"Error: {str(e)}")
+            await response.aread()
+    
+    out.header("TEST 4: Predict Batch Endpoint")
+    out.info(f"Número de instancias: {len(test_data['instances'])}")
+    
+    if response.status_code == 200:
+        out.success(f"Status Code: {response.status_code}")
+        out.success(f"Predicciones realizadas: {data.get('count')}")
+        out.info(f"Modelo: {data.get('model_name')}")
+        out.info(f"Timestamp: {data.get('timestamp')}")
+        
+        out.line("\nPredicciones:")
+        for i, pred in enumerate(data.get('predictions', []), 1):
+            out.line(f"  {i}. ${pred:,.2f}")
+        
+        return True
+    else:
+        out.error(f"Status Code: {response.status_code}")
+        out.error(f"Error: {response.text}")
         return False
 
-def test_model_info_endpoint():
+async def check_model_info_endpoint(client, out):
     """Test del endpoint de información del modelo"""
-    print_header("TEST 5: Model Info Endpoint")
+    response = await client.get("/model/info")
     
-    try:
-        response = requests.get(f"{API_BASE_URL}/model/info")
+    out.header("TEST 5: Model Info Endpoint")
+    
+    if response.status_code == 200:
+        data = orjson.loads(response.content)
+        out.success(f"Status Code: {response.status_code}")
+        out.info(f"Model Type: {data.get('model_type')}")
+        out.info(f"Preprocessor Available: {data.get('preprocessor_available')}")
+        out.info(f"Feature Count: {data.get('feature_count')}")
         
-        if response.status_code == 200:
-            data = response.json()
-            print_success(f"Status Code: {response.status_code}")
-            print_info(f"Model Type: {data.get('model_type')}")
-            print_info(f"Preprocessor Available: {data.get('preprocessor_available')}")
-            print_info(f"Feature Count: {data.get('feature_count')}")
-            
-            if 'model_parameters' in data:
-                print("\nParámetros del modelo:")
-                for key, value in list(data['model_parameters'].items())[:5]:  # Solo primeros 5
-                    print(f"  • {key}: {value}")
-            
-            return True
-        else:
-            print_error(f"Status Code: {response.status_code}")
-            return False
-            
-    except Exception as e:
-        print_error(f"Error: {str(e)}")
+        if 'model_parameters' in data:
+            out.line("\nParámetros del modelo:")
+            for key, value in list(data['model_parameters'].items())[:5]:  # Solo primeros 5
+                out.line(f"  • {key}: {value}")
+        
+        return True
+    else:
+        out.error(f"Status Code: {response.status_code}")
         return False
 
-def test_invalid_input():
-    """Test con entrada inválida"""
-    print_header("TEST 6: Invalid Input Handling")
-    
-    # Datos inválidos (ocean_proximity incorrecto)
-    invalid_data = {
+# Casos de entrada inválida: (campo, valor) que la API debe rechazar con 422
+INVALID_INPUT_CASES = [
+    ("ocean_proximity", "INVALID_CATEGORY"),  # Categoría inválida
+    ("longitude", "abc"),                     # Tipo incorrecto
+    ("latitude", 50.0),                       # Fuera de rango
+    ("households", 0),                        # Menor que el mínimo
+    ("median_income", -1.0)                   # Ingreso negativo
+]
+
+async def check_invalid_input(client, out):
+    """Test con entrada inválida (un caso por cada entrada de INVALID_INPUT_CASES)"""
+    # Datos válidos de base; cada caso sustituye un solo campo
+    valid_data = {
         "longitude": -122.23,
         "latitude": 37.88,
         "housing_median_age": 41.0,
@@ -257,95 +331,266 @@ def test_invalid_input():
         "population": 322.0,
         "households": 126.0,
         "median_income": 8.3252,
-        "ocean_proximity": "INVALID_CATEGORY"  # Categoría inválida
+        "ocean_proximity": "NEAR BAY"
     }
     
-    print_info("Probando con datos inválidos (ocean_proximity incorrecto)")
-    
-    try:
-        response = requests.post(
-            f"{API_BASE_URL}/predict",
-            json=invalid_data,
+    responses = await asyncio.gather(*(
+        client.post(
+            "/predict",
+            content=orjson.dumps({**valid_data, field: value}),
             headers={"Content-Type": "application/json"}
         )
-        
+        for field, value in INVALID_INPUT_CASES
+    ))
+    
+    out.header("TEST 6: Invalid Input Handling")
+    
+    passed = True
+    for (field, value), response in zip(INVALID_INPUT_CASES, responses):
         if response.status_code == 422:  # Validation Error
-            print_success(f"Status Code: {response.status_code} (Validación correcta)")
-            print_info("La API rechazó correctamente los datos inválidos")
-            return True
+            out.success(f"{field}={value!r}: Status Code {response.status_code} (Validación correcta)")
         else:
-            print_error(f"Status Code inesperado: {response.status_code}")
-            return False
-            
-    except Exception as e:
-        print_error(f"Error: {str(e)}")
+            out.error(f"{field}={value!r}: Status Code inesperado {response.status_code}")
+            passed = False
+    
+    if passed:
+        out.info("La API rechazó correctamente los datos inválidos")
+    return passed
+
+async def check_batch_vs_sequential(client, out, n=100, min_speedup=None):
+    """
+    Test de rendimiento: 1 POST a /predict/batch frente a n POST a /predict.
+    
+    Se ejecuta solo, después del resto de tests (ver run_tests), y calienta
+    ambos endpoints antes de medir para que las dos medidas sean comparables.
+    El resultado depende de que ambas vías devuelvan las mismas predicciones;
+    la aceleración medida solo se informa, salvo que se indique min_speedup.
+    
+    Args:
+        client: Cliente httpx compartido
+        out: Reporter del test
+        n: Número de instancias
+        min_speedup: Aceleración mínima exigida (None: no se exige)
+    """
+    sample = {
+        "longitude": -122.23,
+        "latitude": 37.88,
+        "housing_median_age": 41.0,
+        "total_rooms": 880.0,
+        "total_bedrooms": 129.0,
+        "population": 322.0,
+        "households": 126.0,
+        "median_income": 8.3252,
+        "ocean_proximity": "NEAR BAY"
+    }
+    
+    headers = {"Content-Type": "application/json"}
+    batch_payload = orjson.dumps({"instances": [sample] * n})
+    sample_payload = orjson.dumps(sample)
+    
+    # Calentamiento: primera petición de cada endpoint fuera de la medida
+    await client.post("/predict/batch", content=batch_payload, headers=headers)
+    await client.post("/predict", content=sample_payload, headers=headers)
+    
+    start = time.perf_counter()
+    batch_response = await client.post("/predict/batch", content=batch_payload, headers=headers)
+    batch_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    sequential_responses = []
+    for _ in range(n):
+        sequential_responses.append(
+            await client.post("/predict", content=sample_payload, headers=headers)
+        )
+    sequential_time = time.perf_counter() - start
+    
+    out.header("TEST 7: Batch vs Secuencial")
+    out.info(f"Número de instancias: {n}")
+    
+    if batch_response.status_code != 200:
+        out.error(f"Status Code batch: {batch_response.status_code}")
+        return False
+    if any(response.status_code != 200 for response in sequential_responses):
+        out.error("Alguna predicción individual falló")
+        return False
+    
+    batch_predictions = orjson.loads(batch_response.content)["predictions"]
+    sequential_predictions = [
+        orjson.loads(response.content)["prediction"] for response in sequential_responses
+    ]
+    if len(batch_predictions) != n:
+        out.error(f"El batch devolvió {len(batch_predictions)} predicciones (esperadas {n})")
         return False
+    if not all(math.isclose(b, s, rel_tol=1e-6)
+               for b, s in zip(batch_predictions, sequential_predictions)):
+        out.error("Las predicciones batch y secuenciales no coinciden")
+        return False
+    out.success("Predicciones batch y secuenciales coinciden")
+    
+    # Tiempos de reloj: dependen de la carga de la máquina, así que solo se
+    # exige una aceleración mínima si se pide explícitamente (--min-speedup)
+    speedup = sequential_time / batch_time
+    out.info(f"1 POST batch: {batch_time * 1000:.1f} ms")
+    out.info(f"{n} POST individuales: {sequential_time * 1000:.1f} ms")
+    
+    if min_speedup is not None and speedup < min_speedup:
+        out.error(f"Batch solo {speedup:.1f}x más rápido (mínimo {min_speedup:g}x)")
+        return False
+    out.info(f"Batch {speedup:.1f}x más rápido")
+    return True
 
-def run_all_tests():
-    """Ejecutar todos los tests"""
-    print_header("INICIANDO TESTS DE LA API")
-    print(f"URL Base: {API_BASE_URL}")
-    print(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+async def run_test(test_func, client):
+    """Ejecutar un test con su propio Reporter y escribir su salida al terminar"""
+    out = Reporter()
+    try:
+        return await test_func(client, out)
+    finally:
+        out.flush()
+
+async def run_tests(tests, benchmarks=()):
+    """
+    Ejecutar los tests de forma concurrente con un cliente compartido.
+    
+    Cada test acumula su salida en un Reporter propio que se escribe al
+    terminar, de modo que la salida de un test no se intercala con la de
+    los demás. Los benchmarks se ejecutan después, de uno en uno, para que
+    sus tiempos no incluyan el tráfico de los otros tests.
+    
+    Returns:
+        Lista con el resultado de cada test y después de cada benchmark
+        (o la excepción que lanzó)
+    """
+    # httpx se importa aquí para no retrasar el arranque (banner y confirmación)
+    import httpx
+    
+    # Reintentos de conexión para que un fallo transitorio no cuente como test fallido
+    async with httpx.AsyncClient(
+        base_url=API_BASE_URL,
+        timeout=10.0,
+        transport=httpx.AsyncHTTPTransport(
+            retries=2, limits=httpx.Limits(max_keepalive_connections=8)
+        )
+    ) as client:
+        results = await asyncio.gather(
+            *(run_test(test_func, client) for _, test_func in tests),
+            return_exceptions=True
+        )
+        
+        for _, test_func in benchmarks:
+            try:
+                results.append(await run_test(test_func, client))
+            except Exception as e:
+                results.append(e)
+        
+        return results
+
+def run_all_tests(min_speedup=None):
+    """
+    Ejecutar todos los tests.
+    
+    Args:
+        min_speedup: Aceleración mínima exigida al batch (None: solo se informa)
+    
+    Returns:
+        Número de tests fallidos
+    """
+    # Un único instante de referencia para toda la ejecución
+    run_t0 = time.time()
+    
+    out = Reporter()
+    out.header("INICIANDO TESTS DE LA API")
+    out.line(f"URL Base: {API_BASE_URL}")
+    out.line(f"Timestamp: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(run_t0))}")
+    out.flush()
     
     # Lista de tests
     tests = [
-        ("Root Endpoint", test_root_endpoint),
-        ("Health Check", test_health_endpoint),
-        ("Predicción Individual", test_predict_endpoint),
-        ("Predicción Batch", test_predict_batch_endpoint),
-        ("Model Info", test_model_info_endpoint),
-        ("Invalid Input", test_invalid_input)
+        ("Root Endpoint", check_root_endpoint),
+        ("Health Check", check_health_endpoint),
+        ("Predicción Individual", check_predict_endpoint),
+        ("Predicción Batch", check_predict_batch_endpoint),
+        ("Model Info", check_model_info_endpoint),
+        ("Invalid Input", check_invalid_input)
+    ]
+    
+    # Tests de rendimiento: se ejecutan solos, al terminar los anteriores
+    benchmarks = [
+        ("Batch vs Secuencial", partial(check_batch_vs_sequential, min_speedup=min_speedup))
     ]
     
     results = []
+    summary = Reporter()
     
     # Ejecutar tests
-    for test_name, test_func in tests:
-        try:
-            result = test_func()
-            results.append((test_name, result))
-        except Exception as e:
-            print_error(f"Error ejecutando {test_name}: {str(e)}")
-            results.append((test_name, False))
+    for (test_name, _), result in zip(tests + benchmarks, asyncio.run(run_tests(tests, benchmarks))):
+        if isinstance(result, Exception):
+            summary.error(f"Error ejecutando {test_name}: {str(result)}")
+            result = False
+        results.append((test_name, result))
     
     # Resumen
-    print_header("RESUMEN DE TESTS")
+    summary.header("RESUMEN DE TESTS")
     
     passed = sum(1 for _, result in results if result)
     failed = len(results) - passed
     
-    print(f"\nTests ejecutados: {len(results)}")
-    print_success(f"Exitosos: {passed}")
+    summary.line(f"\nTests ejecutados: {len(results)}")
+    summary.line(f"Duración total: {time.time() - run_t0:.2f} s")
+    summary.success(f"Exitosos: {passed}")
     if failed > 0:
-        print_error(f"Fallidos: {failed}")
+        summary.error(f"Fallidos: {failed}")
     else:
-        print_info(f"Fallidos: {failed}")
+        summary.info(f"Fallidos: {failed}")
     
-    print("\nDetalle:")
+    summary.line("\nDetalle:")
     for test_name, result in results:
         status = f"{Colors.GREEN}✓ PASS{Colors.END}" if result else f"{Colors.RED}✗ FAIL{Colors.END}"
-        print(f"  {status} - {test_name}")
+        summary.line(f"  {status} - {test_name}")
     
-    print("\n" + "="*80)
+    summary.line("\n" + "="*80)
     
     if failed == 0:
-        print_success("\n🎉 ¡Todos los tests pasaron exitosamente!")
+        summary.success("\n🎉 ¡Todos los tests pasaron exitosamente!")
     else:
-        print_error(f"\n⚠️  {failed} test(s) fallaron. Revisa los logs arriba.")
+        summary.error(f"\n⚠️  {failed} test(s) fallaron. Revisa los logs arriba.")
+    
+    summary.line("="*80 + "\n")
+    summary.flush()
     
-    print("="*80 + "\n")
+    return failed
 
 if __name__ == "__main__":
-    print("""
-    ╔════════════════════════════════════════════════════════════════════════════╗
-    ║                    API Testing Script - MLOps Pipeline                    ║
-    ║                   California Housing Price Prediction API                 ║
-    ╚════════════════════════════════════════════════════════════════════════════╝
-    """)
+    parser = argparse.ArgumentParser(description="Tests de los endpoints de la API de predicción")
+    parser.add_argument(
+        "--ci",
+        action="store_true",
+        help="Ejecutar sin esperar confirmación (p. ej. smoke test tras un despliegue)"
+    )
+    parser.add_argument(
+        "--min-speedup",
+        type=float,
+        default=None,
+        help="Aceleración mínima del batch frente a las peticiones secuenciales "
+             "para dar el test por bueno (por defecto solo se informa)"
+    )
+    args = parser.parse_args()
+    
+    if sys.stdout.isatty():
+        print("""
+        ╔════════════════════════════════════════════════════════════════════════════╗
+        ║                    API Testing Script - MLOps Pipeline                    ║
+        ║                   California Housing Price Prediction API                 ║
+        ╚════════════════════════════════════════════════════════════════════════════╝
+        """)
     
-    print_info("Asegúrate de que la API está corriendo en http://localhost:8000")
-    print_info("Inicia la API con: uvicorn src.model_deploy:app --reload\n")
+    out = Reporter()
+    out.info("Asegúrate de que la API está corriendo en http://localhost:8000")
+    out.info("Inicia la API con: uvicorn src.model_deploy:app --reload\n")
+    out.flush()
     
-    input("Presiona Enter para comenzar los tests...")
+    if not args.ci:
+        input("Presiona Enter para comenzar los tests...")
     
-    run_all_tests()
+    # Código de salida distinto de cero si algún test falla (p. ej. para CI)
+    failed = run_all_tests(min_speedup=args.min_speedup)
+    sys.exit(1 if failed else 0)